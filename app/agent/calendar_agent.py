@@ -1,22 +1,178 @@
 from langgraph.graph import StateGraph, END
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.tools import Tool
-from typing import Dict, Any, List
-import json
+from langchain_core.runnables import RunnableConfig
+from typing import Dict, Any, List, Optional, Tuple, TypedDict
+from collections import OrderedDict
+from pydantic import ValidationError
+import functools
+import inspect
 import logging
 import re
-from datetime import datetime, timedelta
+import time
+from datetime import datetime, timedelta, date as _date, time as _time
 from app.agent.tools import CalendarTools
+from app.models import Analysis
 from app.config.settings import settings
 
+try:
+    from dateutil.parser import parser as _DateParser
+    _DATE_PARSER = _DateParser()
+except ImportError:
+    _DATE_PARSER = None
+
 logger = logging.getLogger(__name__)
 
+# Maximum number of analyzed messages kept in the analysis cache
+_ANALYSIS_CACHE_SIZE = 512
+
+# Fallback extraction patterns, compiled once at import
+_WEEKDAYS = r'monday|tuesday|wednesday|thursday|friday|saturday|sunday'
+_DATE_RE = re.compile(
+    r'\b(?:(?P<relative>today|tomorrow|yesterday)'
+    r'|\d{1,2}[/-]\d{1,2}[/-]\d{2,4}'
+    rf'|(?:next|this)\s+(?:week|month|{_WEEKDAYS})'
+    rf'|{_WEEKDAYS})\b',
+    re.IGNORECASE
+)
+
+_TIME_RE = re.compile(
+    r'\b(?P<hour>\d{1,2})(?::(?P<minute>\d{2}))?\s*(?P<meridiem>am|pm)?\b',
+    re.IGNORECASE
+)
+
+# Title keywords in priority order
+_TITLE_KEYWORDS = ('meeting', 'call', 'appointment', 'session', 'conference', 'interview')
+
+_MIDNIGHT = _time(0, 0)
+
+# Prompts are module constants with the static instructions first, so the
+# prefix is identical across requests and eligible for Gemini context caching
+_ANALYSIS_PROMPT = """Analyze the user message below for calendar booking.
+
+Choose ONE of these intents:
+1. book_appointment - user wants to book/schedule a new appointment
+2. check_availability - user wants to check if a specific time is available
+3. suggest_times - user wants suggestions for available times
+4. cancel_appointment - user wants to cancel an existing appointment
+5. modify_appointment - user wants to change an existing appointment
+6. list_appointments - user wants to see their scheduled appointments
+7. general_query - general conversation or unclear intent
+
+Extract the following entities if present:
+- title: appointment title/subject
+- date: any date mentioned (convert to YYYY-MM-DD format, use today's date as reference)
+- time: any time mentioned (convert to HH:MM format, 24-hour)
+- duration: duration in minutes if mentioned
+- description: any additional details
+- participant: other people mentioned
+
+If information is not present, use null.
+Example: {{"intent": "book_appointment", "entities": {{"title": "Meeting", "date": "2024-01-15", "time": "14:00", "duration": 60, "description": null, "participant": null}}}}
+
+Current date for reference: {today}
+
+Message: "{message}"
+"""
+
+_RESPONSE_PROMPT = """Generate a natural, conversational response based on the information below.
+
+Make the response:
+- Natural and conversational
+- Helpful and informative
+- Professional but friendly
+- Concise but complete
+
+Do not mention technical details about intents or tools.
+
+User Message: "{message}"
+Intent: {intent}
+Tool Results: {tool_results}
+"""
+
+# Keyword router for messages that don't need the LLM to classify. Cancel/modify
+# verbs must act on the appointment itself: only a few words may sit between
+# them, and no preposition ("remove the location from my appointment")
+_APPOINTMENT_OBJECT = r"\s+(?:(?!(?:from|of|in|on|to|for|with|at|about)\b)[\w':-]+\s+){0,4}?(?:meeting|appointment|event|call)s?\b"
+_FAST_INTENT_PATTERNS = [
+    ("cancel_appointment", re.compile(rf'\b(?:cancel|delete|remove){_APPOINTMENT_OBJECT}', re.IGNORECASE)),
+    ("modify_appointment", re.compile(rf'\b(?:reschedule|move|change){_APPOINTMENT_OBJECT}', re.IGNORECASE)),
+    ("list_appointments", re.compile(r"\b(what'?s|what is|list|show)\b.*\b(schedule|calendar|agenda|appointments|meetings)\b", re.IGNORECASE)),
+]
+
+# Messages mentioning these may combine intents or ask to book, so they always go
+# to the LLM; "schedule" only counts as a verb, not as "my schedule"
+_AMBIGUOUS_RE = re.compile(
+    r'\b(book|available|availability|free|slots?|and then|also|set up|arrange)\b'
+    r"|\b(?:to|can|could|i|we|please|let'?s)\s+schedule\b"
+    r'|\bschedule\s+(?:a|an|another|some|time|it|this|that)\b',
+    re.IGNORECASE
+)
+
+# Date-like text the fallback patterns don't parse: month names, ordinals, ISO
+# dates, or any other digits. The fast path would silently drop such dates
+_DATE_HINT_RE = re.compile(
+    r'\b(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?'
+    r'|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\b|\d',
+    re.IGNORECASE
+)
+
+# Absolute date formats tried when dateutil is not installed
+_FALLBACK_DATE_FORMATS = [
+    '%m/%d/%Y',
+    '%m-%d-%Y',
+    '%d/%m/%Y',
+    '%d-%m-%Y'
+]
+
+
+@functools.lru_cache(maxsize=4)
+def _get_llm(model_name: str, structured: bool = False) -> ChatGoogleGenerativeAI:
+    """Return the process-wide Gemini client for a model, creating it on first use"""
+    kwargs = {}
+    if structured:
+        # Constrained decoding: Gemini can only emit JSON matching the Analysis schema
+        kwargs = {
+            "response_mime_type": "application/json",
+            "response_schema": Analysis.model_json_schema()
+        }
+    
+    return ChatGoogleGenerativeAI(
+        model=model_name,
+        google_api_key=settings.GOOGLE_API_KEY,
+        temperature=0.3,
+        **kwargs
+    )
+
+class AgentState(TypedDict, total=False):
+    """LangGraph state shared by the agent workflow nodes"""
+    user_message: str
+    intent: Optional[str]
+    entities: Dict[str, Any]
+    tool_results: Optional[str]
+    tool_results_is_final: bool
+    response: Optional[str]
+    error: Optional[str]
+
+def _agent_node(method_name: str):
+    """Build a graph node that dispatches to the agent passed in the run config"""
+    async def node(state: AgentState, config: RunnableConfig) -> Dict[str, Any]:
+        agent = config["configurable"]["agent"]
+        result = getattr(agent, method_name)(state)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+    
+    return node
+
 class CalendarAgent:
     """
     LangGraph-based calendar booking agent that processes natural language
     requests and performs calendar operations.
     """
     
+    _compiled_graph = None
+    
     def __init__(self):
         # Updated model name - use one of these current model names
         model_name = getattr(settings, 'MODEL_NAME', 'gemini-1.5-flash')
@@ -33,53 +189,52 @@ class CalendarAgent:
             model_name = model_mapping[model_name]
             logger.warning(f"Updated model name from {settings.MODEL_NAME} to {model_name}")
         
-        self.llm = ChatGoogleGenerativeAI(
-            model=model_name,
-            google_api_key=settings.GOOGLE_API_KEY,
-            temperature=0.3
-        )
+        self.llm = _get_llm(model_name)
+        # Intent/entity analysis is a simple classification task, so it runs on a smaller model
+        self.analysis_llm = _get_llm(settings.CLASSIFIER_MODEL_NAME, structured=True)
         self.calendar_tools = CalendarTools()
-        self.graph = self._create_graph()
-        logger.info(f"Calendar agent initialized with model: {model_name}")
+        self._intent_handlers = {
+            "book_appointment": self._handle_booking,
+            "check_availability": self._handle_availability_check,
+            "suggest_times": self._handle_time_suggestions,
+            "list_appointments": self._handle_list_appointments,
+            "cancel_appointment": self._handle_cancellation,
+            "modify_appointment": self._handle_modification,
+        }
+        # message key -> (stored_at, intent, entities)
+        self._analysis_cache: "OrderedDict[str, Tuple[float, str, Dict[str, Any]]]" = OrderedDict()
+        # Compile the workflow once per process; nodes resolve the agent from the run config
+        if CalendarAgent._compiled_graph is None:
+            CalendarAgent._compiled_graph = self._create_graph()
+        self.graph = CalendarAgent._compiled_graph
+        logger.info(f"Calendar agent initialized with model: {model_name}, classifier: {settings.CLASSIFIER_MODEL_NAME}")
     
-    def _create_graph(self) -> StateGraph:
+    @classmethod
+    def _create_graph(cls) -> StateGraph:
         """Create the LangGraph workflow"""
-        # Define the state schema
-        def default_state():
-            return {
-                "user_message": "",
-                "intent": None,
-                "entities": {},
-                "tool_results": None,
-                "response": None,
-                "error": None
-            }
-        
-        # Create state graph
-        graph = StateGraph(dict)
+        # Create state graph; nodes return only the keys they change
+        graph = StateGraph(AgentState)
         
         # Add nodes
-        graph.add_node("understand_intent", self._understand_intent)
-        graph.add_node("extract_entities", self._extract_entities)
-        graph.add_node("use_tools", self._use_tools)
-        graph.add_node("generate_response", self._generate_response)
-        graph.add_node("handle_error", self._handle_error)
+        graph.add_node("analyze", _agent_node("_analyze"))
+        graph.add_node("use_tools", _agent_node("_use_tools"))
+        graph.add_node("generate_response", _agent_node("_generate_response"))
+        graph.add_node("handle_error", _agent_node("_handle_error"))
         
         # Add edges with conditional logic for error handling
-        graph.add_edge("understand_intent", "extract_entities")
         graph.add_conditional_edges(
-            "extract_entities",
+            "analyze",
             lambda x: "handle_error" if x.get("error") else "use_tools"
         )
         graph.add_conditional_edges(
             "use_tools",
-            lambda x: "handle_error" if x.get("error") else "generate_response"
+            lambda x: "handle_error" if x.get("error") else (END if x.get("tool_results_is_final") else "generate_response")
         )
         graph.add_edge("generate_response", END)
         graph.add_edge("handle_error", END)
         
         # Set entry point
-        graph.set_entry_point("understand_intent")
+        graph.set_entry_point("analyze")
         
         return graph.compile()
     
@@ -91,11 +246,15 @@ class CalendarAgent:
                 "intent": None,
                 "entities": {},
                 "tool_results": None,
+                "tool_results_is_final": False,
                 "response": None,
                 "error": None
             }
             
-            result = await self.graph.ainvoke(initial_state)
+            result = await self.graph.ainvoke(
+                initial_state,
+                config={"configurable": {"agent": self}}
+            )
             
             if result.get("error"):
                 return f"I apologize, but I encountered an error: {result['error']}"
@@ -106,212 +265,175 @@ class CalendarAgent:
             logger.error(f"Error processing message: {e}")
             return f"I apologize, but I encountered an error while processing your request: {str(e)}"
     
-    def _understand_intent(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        """Analyze user message to determine intent"""
+    async def _analyze(self, state: AgentState) -> Dict[str, Any]:
+        """Determine intent and extract entities with a single LLM call"""
         try:
-            prompt = f"""
-            Analyze this user message and determine the primary intent:
-            
-            Message: "{state['user_message']}"
-            
-            Choose ONE of these intents:
-            1. book_appointment - user wants to book/schedule a new appointment
-            2. check_availability - user wants to check if a specific time is available
-            3. suggest_times - user wants suggestions for available times
-            4. cancel_appointment - user wants to cancel an existing appointment
-            5. modify_appointment - user wants to change an existing appointment
-            6. list_appointments - user wants to see their scheduled appointments
-            7. general_query - general conversation or unclear intent
-            
-            Respond with ONLY the intent name (e.g., "book_appointment").
-            """
-            
-            response = self.llm.invoke(prompt)
-            intent = response.content.strip().lower()
-            
-            state["intent"] = intent
-            logger.info(f"Detected intent: {intent}")
-            
-        except Exception as e:
-            logger.error(f"Error understanding intent: {e}")
-            state["error"] = f"Failed to understand your request: {str(e)}"
-        
-        return state
-    
-    def _extract_entities(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        """Extract relevant entities from user message"""
-        try:
-            if state.get("error"):
-                return state
-            
-            prompt = f"""
-            Extract relevant information from this message for calendar booking:
-            
-            Message: "{state['user_message']}"
-            Intent: {state['intent']}
-            
-            Extract the following information if present:
-            - title: appointment title/subject
-            - date: any date mentioned (convert to YYYY-MM-DD format, use today's date as reference)
-            - time: any time mentioned (convert to HH:MM format, 24-hour)
-            - duration: duration in minutes if mentioned
-            - description: any additional details
-            - participant: other people mentioned
-            
-            Important: Return ONLY valid JSON without any markdown formatting or code blocks.
-            If information is not present, use null.
-            Example: {{"title": "Meeting", "date": "2024-01-15", "time": "14:00", "duration": 60, "description": null, "participant": null}}
-            
-            Current date for reference: {datetime.now().strftime('%Y-%m-%d')}
-            """
-            
-            response = self.llm.invoke(prompt)
-            entities_text = response.content.strip()
-            
-            # Clean up potential markdown formatting
-            entities_text = self._clean_json_response(entities_text)
+            fast = self._fast_analysis(state['user_message'])
+            if fast:
+                logger.info(f"Keyword fast-path analysis: {fast}")
+                return {"intent": fast[0], "entities": fast[1]}
+            
+            cache_key = self._analysis_cache_key(state['user_message'])
+            cached = self._get_cached_analysis(cache_key)
+            if cached:
+                logger.info(f"Analysis cache hit: {cached}")
+                return {"intent": cached[0], "entities": cached[1]}
+            
+            prompt = _ANALYSIS_PROMPT.format(
+                today=datetime.now().strftime('%Y-%m-%d'),
+                message=state['user_message']
+            )
             
-            # Try to parse JSON
-            try:
-                entities = json.loads(entities_text)
-                logger.info(f"Successfully parsed JSON entities: {entities}")
-            except json.JSONDecodeError as e:
-                logger.warning(f"Failed to parse JSON from LLM response: {entities_text}")
-                logger.warning(f"JSON error: {e}")
-                # Fallback to simple extraction
+            analysis = None
+            # One retry with the validation error fed back to the model
+            for attempt in range(2):
+                response = await self.analysis_llm.ainvoke(prompt)
+                try:
+                    analysis = Analysis.model_validate_json(response.content)
+                    break
+                except ValidationError as e:
+                    logger.warning(f"Invalid analysis from LLM (attempt {attempt + 1}): {response.content}")
+                    prompt += f"\nYour previous response failed validation: {e}\nRespond again with JSON matching the schema.\n"
+            
+            if analysis:
+                intent = analysis.intent
+                entities = analysis.entities.model_dump(exclude_none=True)
+                logger.info(f"Successfully parsed analysis: {analysis}")
+                self._store_cached_analysis(cache_key, intent, entities)
+            else:
+                # Last resort if the model still drifts from the schema
+                intent = "general_query"
                 entities = self._simple_entity_extraction(state['user_message'])
                 logger.info(f"Using fallback extraction: {entities}")
             
-            state["entities"] = entities
-            logger.info(f"Final extracted entities: {entities}")
+            logger.info(f"Detected intent: {intent}, entities: {entities}")
+            return {"intent": intent, "entities": entities}
             
         except Exception as e:
-            logger.error(f"Error extracting entities: {e}")
-            state["error"] = f"Failed to extract information from your message: {str(e)}"
+            logger.error(f"Error analyzing message: {e}")
+            return {"error": f"Failed to understand your request: {str(e)}"}
+    
+    def _fast_intent(self, message: str) -> Optional[str]:
+        """Classify unambiguous messages with keyword rules"""
+        if _AMBIGUOUS_RE.search(message):
+            return None
+        
+        for intent, pattern in _FAST_INTENT_PATTERNS:
+            if pattern.search(message):
+                return intent
+        
+        return None
+    
+    def _fast_analysis(self, message: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Analyze trivially classifiable messages without calling the LLM"""
+        intent = self._fast_intent(message)
+        if not intent or self._has_unparsed_date_text(message):
+            return None
+        
+        entities = self._simple_entity_extraction(message)
+        if 'date' in entities:
+            # Downstream handlers expect YYYY-MM-DD; defer to the LLM otherwise
+            target_date = self._parse_date_component(entities['date'])
+            if not target_date:
+                return None
+            entities['date'] = target_date.strftime('%Y-%m-%d')
         
-        return state
+        return intent, entities
     
-    def _clean_json_response(self, text: str) -> str:
-        """Clean JSON response from potential markdown formatting"""
-        # Remove markdown code blocks
-        text = re.sub(r'```json\s*', '', text)
-        text = re.sub(r'```\s*', '', text)
+    def _has_unparsed_date_text(self, message: str) -> bool:
+        """Check for date-like text left over after the date and time the fallback extraction captures"""
+        residue = _DATE_RE.sub(' ', message, count=1)
+        time_match = next((m for m in _TIME_RE.finditer(residue) if m.group('minute') or m.group('meridiem')), None)
+        if time_match:
+            residue = f"{residue[:time_match.start()]} {residue[time_match.end():]}"
+        return bool(_DATE_HINT_RE.search(residue))
+    
+    def _analysis_cache_key(self, message: str) -> str:
+        """Canonicalize a message for analysis cache lookups"""
+        canonical = " ".join(message.lower().split()).rstrip(".!?")
+        # Relative dates resolve against today, so entries never outlive the day
+        return f"{datetime.now().strftime('%Y-%m-%d')}|{canonical}"
+    
+    def _get_cached_analysis(self, key: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Return cached (intent, entities) for a message key if still fresh"""
+        if not settings.ENABLE_CACHING:
+            return None
         
-        # Remove any leading/trailing whitespace
-        text = text.strip()
+        entry = self._analysis_cache.get(key)
+        if not entry:
+            return None
+        
+        stored_at, intent, entities = entry
+        if time.monotonic() - stored_at > settings.CACHE_TTL:
+            del self._analysis_cache[key]
+            return None
         
-        # Try to find JSON object in the text
-        json_match = re.search(r'\{.*\}', text, re.DOTALL)
-        if json_match:
-            return json_match.group()
+        self._analysis_cache.move_to_end(key)
+        return intent, dict(entities)
+    
+    def _store_cached_analysis(self, key: str, intent: str, entities: Dict[str, Any]) -> None:
+        """Store an analysis result, evicting the least recently used entry"""
+        if not settings.ENABLE_CACHING:
+            return
         
-        return text
+        self._analysis_cache[key] = (time.monotonic(), intent, dict(entities))
+        self._analysis_cache.move_to_end(key)
+        if len(self._analysis_cache) > _ANALYSIS_CACHE_SIZE:
+            self._analysis_cache.popitem(last=False)
     
     def _simple_entity_extraction(self, message: str) -> Dict[str, Any]:
         """Enhanced fallback entity extraction using regex patterns"""
         entities = {}
         
-        # Extract date patterns
-        date_patterns = [
-            (r'\b(today)\b', 'today'),
-            (r'\b(tomorrow)\b', 'tomorrow'),
-            (r'\b(yesterday)\b', 'yesterday'),
-            (r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b', None),
-            (r'\b(monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b', None),
-            (r'\b(next|this)\s+(week|month|monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b', None)
-        ]
-        
-        # Extract time patterns
-        time_patterns = [
-            (r'\b(\d{1,2})\s*(pm|PM)\b', 'pm'),
-            (r'\b(\d{1,2})\s*(am|AM)\b', 'am'),
-            (r'\b(\d{1,2}):(\d{2})\s*(am|pm|AM|PM)?\b', 'full'),
-            (r'\b(\d{1,2}):(\d{2})\b', '24hr')
-        ]
-        
         # Extract date
-        for pattern, date_type in date_patterns:
-            match = re.search(pattern, message, re.IGNORECASE)
-            if match:
-                if date_type:
-                    entities['date'] = date_type
-                else:
-                    entities['date'] = match.group().strip()
-                break
-        
-        # Extract time
-        for pattern, time_type in time_patterns:
-            match = re.search(pattern, message, re.IGNORECASE)
-            if match:
-                if time_type == 'pm':
-                    hour = int(match.group(1))
-                    if hour != 12:
-                        hour += 12
-                    entities['time'] = f"{hour:02d}:00"
-                elif time_type == 'am':
-                    hour = int(match.group(1))
-                    if hour == 12:
-                        hour = 0
-                    entities['time'] = f"{hour:02d}:00"
-                elif time_type == 'full':
-                    hour = int(match.group(1))
-                    minute = int(match.group(2))
-                    if len(match.groups()) > 2 and match.group(3):
-                        if match.group(3).lower() == 'pm' and hour != 12:
-                            hour += 12
-                        elif match.group(3).lower() == 'am' and hour == 12:
-                            hour = 0
-                    entities['time'] = f"{hour:02d}:{minute:02d}"
-                else:
-                    entities['time'] = match.group().strip()
-                break
+        match = _DATE_RE.search(message)
+        if match:
+            relative = match.group('relative')
+            entities['date'] = relative.lower() if relative else match.group().strip()
         
-        # Extract title (look for appointment-related keywords)
-        title_keywords = ['meeting', 'call', 'appointment', 'session', 'conference', 'interview']
-        for keyword in title_keywords:
-            if keyword in message.lower():
-                entities['title'] = keyword.capitalize()
-                break
+        # Extract time: first number carrying minutes and/or an am/pm marker
+        for match in _TIME_RE.finditer(message):
+            minute, meridiem = match.group('minute'), match.group('meridiem')
+            if not minute and not meridiem:
+                continue
+            
+            hour = int(match.group('hour'))
+            minute = int(minute) if minute else 0
+            if meridiem:
+                meridiem = meridiem.lower()
+                if meridiem == 'pm' and hour != 12:
+                    hour += 12
+                elif meridiem == 'am' and hour == 12:
+                    hour = 0
+            entities['time'] = f"{hour:02d}:{minute:02d}"
+            break
         
-        # If no specific title found, use generic
-        if 'title' not in entities:
-            entities['title'] = 'Appointment'
+        # Extract title (look for appointment-related keywords), defaulting to generic
+        message_lower = message.lower()
+        keyword = next((k for k in _TITLE_KEYWORDS if k in message_lower), 'appointment')
+        entities['title'] = keyword.capitalize()
         
         return entities
     
-    def _use_tools(self, state: Dict[str, Any]) -> Dict[str, Any]:
+    async def _use_tools(self, state: AgentState) -> Dict[str, Any]:
         """Execute appropriate tools based on intent and entities"""
         try:
-            if state.get("error"):
-                return state
-            
-            intent = state["intent"]
-            entities = state["entities"]
-            
-            if intent == "book_appointment":
-                result = self._handle_booking(entities)
-            elif intent == "check_availability":
-                result = self._handle_availability_check(entities)
-            elif intent == "suggest_times":
-                result = self._handle_time_suggestions(entities)
-            elif intent == "list_appointments":
-                result = self._handle_list_appointments(entities)
-            elif intent == "cancel_appointment":
-                result = self._handle_cancellation(entities)
-            elif intent == "modify_appointment":
-                result = self._handle_modification(entities)
-            else:
-                result = "I can help you book appointments, check availability, suggest times, or manage your calendar. What would you like to do?"
+            handler = self._intent_handlers.get(state["intent"], self._handle_general)
+            result = await handler(state["entities"])
             
-            state["tool_results"] = result
+            # Calendar handlers already return user-facing text; only general
+            # conversation goes on to be phrased by the LLM
+            is_final = state["intent"] in self._intent_handlers
+            update = {"tool_results": result, "tool_results_is_final": is_final}
+            if is_final:
+                update["response"] = result
+            return update
             
         except Exception as e:
             logger.error(f"Error using tools: {e}")
-            state["error"] = f"Error executing calendar operation: {str(e)}"
-        
-        return state
+            return {"error": f"Error executing calendar operation: {str(e)}"}
     
-    def _handle_booking(self, entities: Dict[str, Any]) -> str:
+    async def _handle_booking(self, entities: Dict[str, Any]) -> str:
         """Handle appointment booking"""
         try:
             title = entities.get('title', 'Appointment')
@@ -329,7 +451,7 @@ class CalendarAgent:
                 return "I couldn't understand the date and time. Please provide them in a clear format like 'tomorrow at 2 PM' or 'October 27th at 2:00 PM'."
             
             # Book the appointment
-            result = self.calendar_tools.book_appointment(
+            result = await self.calendar_tools.book_appointment(
                 title=title,
                 start_time=booking_datetime,
                 duration_minutes=duration if duration else 60,
@@ -342,7 +464,7 @@ class CalendarAgent:
             logger.error(f"Error in booking handler: {e}")
             return f"Error booking appointment: {str(e)}"
     
-    def _handle_availability_check(self, entities: Dict[str, Any]) -> str:
+    async def _handle_availability_check(self, entities: Dict[str, Any]) -> str:
         """Handle availability checking"""
         try:
             date = entities.get('date')
@@ -355,14 +477,14 @@ class CalendarAgent:
             if not check_datetime:
                 return "I couldn't understand the date and time format."
             
-            result = self.calendar_tools.check_availability(check_datetime)
+            result = await self.calendar_tools.check_availability(check_datetime)
             return result
             
         except Exception as e:
             logger.error(f"Error in availability check: {e}")
             return f"Error checking availability: {str(e)}"
     
-    def _handle_time_suggestions(self, entities: Dict[str, Any]) -> str:
+    async def _handle_time_suggestions(self, entities: Dict[str, Any]) -> str:
         """Handle time suggestions"""
         try:
             date = entities.get('date')
@@ -374,24 +496,24 @@ class CalendarAgent:
             if not target_date:
                 return "I couldn't understand the date format."
             
-            result = self.calendar_tools.suggest_available_times(target_date)
+            result = await self.calendar_tools.suggest_available_times(target_date)
             return result
             
         except Exception as e:
             logger.error(f"Error in time suggestions: {e}")
             return f"Error suggesting times: {str(e)}"
     
-    def _handle_list_appointments(self, entities: Dict[str, Any]) -> str:
+    async def _handle_list_appointments(self, entities: Dict[str, Any]) -> str:
         """Handle listing appointments"""
         try:
             date = entities.get('date')
-            result = self.calendar_tools.list_appointments(date)
+            result = await self.calendar_tools.list_appointments(date)
             return result
         except Exception as e:
             logger.error(f"Error listing appointments: {e}")
             return f"Error listing appointments: {str(e)}"
     
-    def _handle_cancellation(self, entities: Dict[str, Any]) -> str:
+    async def _handle_cancellation(self, entities: Dict[str, Any]) -> str:
         """Handle appointment cancellation"""
         try:
             # This would need more sophisticated entity extraction
@@ -400,7 +522,7 @@ class CalendarAgent:
             logger.error(f"Error in cancellation: {e}")
             return f"Error canceling appointment: {str(e)}"
     
-    def _handle_modification(self, entities: Dict[str, Any]) -> str:
+    async def _handle_modification(self, entities: Dict[str, Any]) -> str:
         """Handle appointment modification"""
         try:
             return "Appointment modification is not yet implemented. Please specify which appointment you'd like to modify."
@@ -408,43 +530,31 @@ class CalendarAgent:
             logger.error(f"Error in modification: {e}")
             return f"Error modifying appointment: {str(e)}"
     
-    def _generate_response(self, state: Dict[str, Any]) -> Dict[str, Any]:
+    async def _handle_general(self, entities: Dict[str, Any]) -> str:
+        """Handle general conversation"""
+        return "I can help you book appointments, check availability, suggest times, or manage your calendar. What would you like to do?"
+    
+    async def _generate_response(self, state: AgentState) -> Dict[str, Any]:
         """Generate natural language response"""
         try:
-            if state.get("error"):
-                return state
-            
-            prompt = f"""
-            Generate a natural, conversational response based on the following:
-            
-            User Message: "{state['user_message']}"
-            Intent: {state['intent']}
-            Tool Results: {state['tool_results']}
-            
-            Make the response:
-            - Natural and conversational
-            - Helpful and informative
-            - Professional but friendly
-            - Concise but complete
-            
-            Do not mention technical details about intents or tools.
-            """
+            prompt = _RESPONSE_PROMPT.format(
+                message=state['user_message'],
+                intent=state['intent'],
+                tool_results=state['tool_results']
+            )
             
-            response = self.llm.invoke(prompt)
-            state["response"] = response.content
+            response = await self.llm.ainvoke(prompt)
+            return {"response": response.content}
             
         except Exception as e:
             logger.error(f"Error generating response: {e}")
-            state["response"] = state.get("tool_results", "I'm sorry, I couldn't generate a proper response.")
-        
-        return state
+            return {"response": state.get("tool_results", "I'm sorry, I couldn't generate a proper response.")}
     
-    def _handle_error(self, state: Dict[str, Any]) -> Dict[str, Any]:
+    def _handle_error(self, state: AgentState) -> Dict[str, Any]:
         """Handle errors gracefully"""
         error_msg = state.get("error", "Unknown error occurred")
-        state["response"] = f"I apologize, but I encountered an issue: {error_msg}. Please try again or rephrase your request."
         logger.error(f"Error state reached: {error_msg}")
-        return state
+        return {"response": f"I apologize, but I encountered an issue: {error_msg}. Please try again or rephrase your request."}
     
     def _parse_datetime(self, date_str: str, time_str: str) -> datetime:
         """Parse date and time strings into datetime object"""
@@ -489,30 +599,25 @@ class CalendarAgent:
             elif date_str == 'yesterday':
                 return (now - timedelta(days=1)).date()
             
-            # Handle absolute dates
-            # Try different formats
-            formats = [
-                '%Y-%m-%d',
-                '%m/%d/%Y',
-                '%m-%d-%Y',
-                '%d/%m/%Y',
-                '%d-%m-%Y'
-            ]
-            
-            for fmt in formats:
+            # Handle the YYYY-MM-DD format the LLM is asked to emit
+            try:
+                return _date.fromisoformat(date_str)
+            except ValueError:
+                pass
+            
+            # dateutil covers every other format when available
+            if _DATE_PARSER:
+                try:
+                    return _DATE_PARSER.parse(date_str).date()
+                except (ValueError, OverflowError):
+                    return None
+            
+            for fmt in _FALLBACK_DATE_FORMATS:
                 try:
                     return datetime.strptime(date_str, fmt).date()
                 except ValueError:
                     continue
             
-            # Try with dateutil if available
-            try:
-                from dateutil import parser
-                parsed = parser.parse(date_str)
-                return parsed.date()
-            except (ImportError, ValueError):
-                pass
-            
             return None
             
         except Exception as e:
@@ -527,6 +632,12 @@ class CalendarAgent:
             
             time_str = time_str.lower().strip()
             
+            # Handle the HH:MM format the LLM is asked to emit
+            try:
+                return _time.fromisoformat(time_str)
+            except ValueError:
+                pass
+            
             # Handle 12-hour format with AM/PM
             if 'pm' in time_str or 'am' in time_str:
                 is_pm = 'pm' in time_str
@@ -544,16 +655,16 @@ class CalendarAgent:
                 elif not is_pm and hour == 12:
                     hour = 0
                 
-                return datetime.min.time().replace(hour=hour, minute=minute)
+                return _time(hour, minute)
             
             # Handle 24-hour format
             if ':' in time_str:
                 hour, minute = map(int, time_str.split(':'))
-                return datetime.min.time().replace(hour=hour, minute=minute)
+                return _time(hour, minute)
             
             # Handle hour only
             hour = int(time_str)
-            return datetime.min.time().replace(hour=hour, minute=0)
+            return _time(hour, 0)
             
         except Exception as e:
             logger.error(f"Error parsing time component: {e}")
@@ -564,7 +675,7 @@ class CalendarAgent:
         try:
             target_date = self._parse_date_component(date_str)
             if target_date:
-                return datetime.combine(target_date, datetime.min.time())
+                return datetime.combine(target_date, _MIDNIGHT)
             return None
             
         except Exception as e:
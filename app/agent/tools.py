@@ -1,19 +1,57 @@
-from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from datetime import datetime, date, timedelta
+from typing import Dict, Any, Optional, Tuple
 import logging
-from app.services.calendar_service import GoogleCalendarService
+import time
+from app.config.settings import settings
+from app.services.calendar_service import get_calendar_service
 
 logger = logging.getLogger(__name__)
 
+# Maximum entries per availability cache
+_CACHE_MAXSIZE = 1024
+
+# Month names for user-facing dates, indexed by month - 1
+_MONTHS = (
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December",
+)
+
+# User-facing error replies; exception details are only appended in debug mode
+_ERR_AVAILABILITY = "I couldn't check availability due to an error"
+_ERR_BOOK = "❌ I couldn't book the appointment due to an error"
+_ERR_SUGGEST = "❌ I couldn't suggest available times due to an error"
+_ERR_LIST = "❌ I couldn't list appointments due to an error"
+_ERR_CANCEL = "❌ I couldn't cancel the appointment due to an error"
+_ERR_MODIFY = "❌ I couldn't modify the appointment due to an error"
+_ERR_STATUS = "❌ Calendar status check failed"
+_ERR_NEXT_SLOT = "❌ I couldn't find the next available slot due to an error"
+
+def _error_reply(message: str, error: Exception) -> str:
+    """Build an error reply, exposing the exception text only when debugging"""
+    if settings.DEBUG:
+        return f"{message}: {error}"
+    return f"{message}."
+
+def _fmt_dt(dt: datetime) -> str:
+    """Format a datetime as 'January 05, 2025 at 02:30 PM' without strftime"""
+    hour = dt.hour
+    return f"{_MONTHS[dt.month - 1]} {dt.day:02d}, {dt.year} at {hour % 12 or 12:02d}:{dt.minute:02d} {'AM' if hour < 12 else 'PM'}"
+
+def _fmt_date(dt: datetime) -> str:
+    """Format a date as 'January 05, 2025' without strftime"""
+    return f"{_MONTHS[dt.month - 1]} {dt.day:02d}, {dt.year}"
+
 class CalendarTools:
     """
     Calendar tools for booking, checking availability, and managing appointments
     """
     
     def __init__(self):
-        self.calendar_service = GoogleCalendarService()
+        self.calendar_service = get_calendar_service()
+        # (slot start, duration) -> (stored_at, is_available)
+        self._availability_cache: Dict[Tuple[datetime, int], Tuple[float, bool]] = {}
     
-    def check_availability(self, start_time: datetime, duration_minutes: int = 60) -> str:
+    async def check_availability(self, start_time: datetime, duration_minutes: int = 60) -> str:
         """
         Check if a specific date/time is available
         
@@ -27,18 +65,25 @@ class CalendarTools:
         try:
             end_time = start_time + timedelta(minutes=duration_minutes)
             
-            is_available = self.calendar_service.check_availability(start_time, end_time)
+            cache_key = (start_time.replace(second=0, microsecond=0), duration_minutes)
+            is_available = self._cache_get(self._availability_cache, cache_key)
+            if is_available is None:
+                is_available = await self.calendar_service.acheck_availability(start_time, end_time)
+                if is_available is None:
+                    # The lookup failed; don't cache it as a conflict
+                    return f"{_ERR_AVAILABILITY}."
+                self._cache_set(self._availability_cache, cache_key, is_available)
             
             if is_available:
-                return f"✅ The time slot on {start_time.strftime('%B %d, %Y at %I:%M %p')} is available!"
+                return f"✅ The time slot on {_fmt_dt(start_time)} is available!"
             else:
-                return f"❌ The time slot on {start_time.strftime('%B %d, %Y at %I:%M %p')} is not available. Please choose a different time."
+                return f"❌ The time slot on {_fmt_dt(start_time)} is not available. Please choose a different time."
                 
         except Exception as e:
-            logger.error(f"Error checking availability: {e}")
-            return f"I couldn't check availability due to an error: {str(e)}"
+            logger.exception("Error checking availability")
+            return _error_reply(_ERR_AVAILABILITY, e)
     
-    def book_appointment(self, title: str, start_time: datetime, duration_minutes: int = 60, description: str = "") -> str:
+    async def book_appointment(self, title: str, start_time: datetime, duration_minutes: int = 60, description: str = "") -> str:
         """
         Book an appointment
         
@@ -56,27 +101,29 @@ class CalendarTools:
             duration = duration_minutes if duration_minutes is not None else 60
             end_time = start_time + timedelta(minutes=duration)
             
-            # First check if time is available
-            if not self.calendar_service.check_availability(start_time, end_time):
-                return f"❌ Sorry, the time slot on {start_time.strftime('%B %d, %Y at %I:%M %p')} is not available. Please choose a different time."
-            
-            # Create the event
-            event = self.calendar_service.create_event(
+            # Check and create in one round-trip; the event is rolled back on conflict
+            event = await self.calendar_service.abook_event_if_free(
                 title=title,
                 start_time=start_time,
                 end_time=end_time,
                 description=description
             )
+            
+            # A booking changes the day; a conflict means a cached "available" answer is stale
+            self._invalidate_day(start_time.date())
+            if event is None:
+                return f"❌ Sorry, the time slot on {_fmt_dt(start_time)} is not available. Please choose a different time."
+            
             status = event.get('status', 'confirmed')
             htmlLink = event.get('htmlLink', '')
-            return f"""✅ Appointment '{title}' successfully booked for {start_time.strftime('%B %d, %Y at %I:%M %p')} ({duration_minutes} minutes)! and
+            return f"""✅ Appointment '{title}' successfully booked for {_fmt_dt(start_time)} ({duration_minutes} minutes)! and
             {'Status: ' + status if status else ''} {'Link: ' + htmlLink if htmlLink else ''}"""
             
         except Exception as e:
-            logger.error(f"Error booking appointment: {e}")
-            return f"❌ I couldn't book the appointment due to an error: {str(e)}"
+            logger.exception("Error booking appointment")
+            return _error_reply(_ERR_BOOK, e)
     
-    def suggest_available_times(self, date: datetime, duration_minutes: int = 60, num_suggestions: int = 5) -> str:
+    async def suggest_available_times(self, date: datetime, duration_minutes: int = 60, num_suggestions: int = 5) -> str:
         """
         Suggest available time slots for a given date
         
@@ -89,28 +136,25 @@ class CalendarTools:
             String with available time suggestions
         """
         try:
-            available_slots = self.calendar_service.get_available_slots(
+            # The service caches slots per day and drops them when the day changes
+            available_slots = await self.calendar_service.aget_available_slots(
                 date=date,
                 duration_minutes=duration_minutes
             )
             
             if not available_slots:
-                return f"❌ No available time slots found for {date.strftime('%B %d, %Y')}. Please try a different date."
+                return f"❌ No available time slots found for {_fmt_date(date)}. Please try a different date."
             
             # Format the suggestions
-            suggestions = []
-            for slot in available_slots[:num_suggestions]:
-                suggestions.append(f"• {slot}")
+            suggestion_text = "\n".join(f"• {slot}" for slot in available_slots[:num_suggestions])
             
-            suggestion_text = "\n".join(suggestions)
-            
-            return f"📅 Available time slots for {date.strftime('%B %d, %Y')}:\n\n{suggestion_text}"
+            return f"📅 Available time slots for {_fmt_date(date)}:\n\n{suggestion_text}"
             
         except Exception as e:
-            logger.error(f"Error suggesting times: {e}")
-            return f"❌ I couldn't suggest available times due to an error: {str(e)}"
+            logger.exception("Error suggesting times")
+            return _error_reply(_ERR_SUGGEST, e)
     
-    def list_appointments(self, date: Optional[str] = None) -> str:
+    async def list_appointments(self, date: Optional[str] = None) -> str:
         """
         List appointments for a specific date or upcoming appointments
         
@@ -122,35 +166,33 @@ class CalendarTools:
         """
         try:
             if date:
-                # Parse date and get appointments for that day
-                from dateutil import parser
-                target_date = parser.parse(date)
-                appointments = self.calendar_service.get_appointments_for_date(target_date)
-                date_str = target_date.strftime('%B %d, %Y')
+                # Parse date and get appointments for that day; YYYY-MM-DD is the
+                # documented format, dateutil only handles anything freeform
+                try:
+                    target_date = datetime.fromisoformat(date)
+                except ValueError:
+                    from dateutil import parser
+                    target_date = parser.parse(date)
+                appointments = await self.calendar_service.aget_appointments_for_date(target_date)
+                date_str = _fmt_date(target_date)
             else:
                 # Get upcoming appointments
-                appointments = self.calendar_service.get_upcoming_appointments()
+                appointments = await self.calendar_service.aget_upcoming_appointments()
                 date_str = "upcoming"
             
             if not appointments:
                 return f"📅 No appointments found for {date_str}."
             
             # Format appointments
-            appointment_list = []
-            for apt in appointments:
-                start_time = apt.get('start_time', 'Unknown time')
-                title = apt.get('title', 'No title')
-                appointment_list.append(f"• {start_time} - {title}")
-            
-            appointments_text = "\n".join(appointment_list)
+            appointments_text = "\n".join(f"• {apt.start_time} - {apt.title}" for apt in appointments)
             
             return f"📅 Appointments for {date_str}:\n\n{appointments_text}"
             
         except Exception as e:
-            logger.error(f"Error listing appointments: {e}")
-            return f"❌ I couldn't list appointments due to an error: {str(e)}"
+            logger.exception("Error listing appointments")
+            return _error_reply(_ERR_LIST, e)
     
-    def cancel_appointment(self, appointment_id: str) -> str:
+    async def cancel_appointment(self, appointment_id: str) -> str:
         """
         Cancel an appointment
         
@@ -161,18 +203,18 @@ class CalendarTools:
             Confirmation message
         """
         try:
-            success = self.calendar_service.cancel_event(appointment_id)
-            
+            success = await self.calendar_service.acancel_event(appointment_id)
             if success:
+                self._clear_caches()
                 return f"✅ Appointment successfully canceled!"
             else:
                 return f"❌ I couldn't cancel the appointment. Please check the appointment ID."
                 
         except Exception as e:
-            logger.error(f"Error canceling appointment: {e}")
-            return f"❌ I couldn't cancel the appointment due to an error: {str(e)}"
+            logger.exception("Error canceling appointment")
+            return _error_reply(_ERR_CANCEL, e)
     
-    def modify_appointment(self, appointment_id: str, **kwargs) -> str:
+    async def modify_appointment(self, appointment_id: str, **kwargs) -> str:
         """
         Modify an existing appointment
         
@@ -184,18 +226,18 @@ class CalendarTools:
             Confirmation message
         """
         try:
-            success = self.calendar_service.update_event(appointment_id, **kwargs)
-            
+            success = await self.calendar_service.aupdate_event(appointment_id, **kwargs)
             if success:
+                self._clear_caches()
                 return f"✅ Appointment successfully updated!"
             else:
                 return f"❌ I couldn't update the appointment. Please check the appointment ID."
                 
         except Exception as e:
-            logger.error(f"Error modifying appointment: {e}")
-            return f"❌ I couldn't modify the appointment due to an error: {str(e)}"
+            logger.exception("Error modifying appointment")
+            return _error_reply(_ERR_MODIFY, e)
     
-    def get_calendar_status(self) -> str:
+    async def get_calendar_status(self) -> str:
         """
         Get general calendar status and connectivity
         
@@ -203,7 +245,7 @@ class CalendarTools:
             Status message
         """
         try:
-            status = self.calendar_service.test_connection()
+            status = await self.calendar_service.atest_connection()
             
             if status:
                 return "✅ Calendar is connected and working properly!"
@@ -211,10 +253,10 @@ class CalendarTools:
                 return "❌ Calendar connection issues detected."
                 
         except Exception as e:
-            logger.error(f"Error checking calendar status: {e}")
-            return f"❌ Calendar status check failed: {str(e)}"
+            logger.exception("Error checking calendar status")
+            return _error_reply(_ERR_STATUS, e)
     
-    def find_next_available_slot(self, preferred_date: datetime, duration_minutes: int = 60) -> str:
+    async def find_next_available_slot(self, preferred_date: datetime, duration_minutes: int = 60) -> str:
         """
         Find the next available time slot starting from a preferred date
         
@@ -226,20 +268,55 @@ class CalendarTools:
             Next available slot information
         """
         try:
-            # Search for next 7 days
+            # Fetch the whole week's busy intervals in one free/busy query
+            search_start = preferred_date.replace(hour=0, minute=0, second=0, microsecond=0)
+            busy_times = await self.calendar_service.aget_busy_intervals(
+                search_start,
+                search_start + timedelta(days=7)
+            )
+            
             for i in range(7):
                 search_date = preferred_date + timedelta(days=i)
-                available_slots = self.calendar_service.get_available_slots(
-                    date=search_date,
-                    duration_minutes=duration_minutes
-                )
-                
-                if available_slots:
-                    next_slot = available_slots[0]
-                    return f"🔍 Next available slot: {next_slot} on {search_date.strftime('%B %d, %Y')}"
+                next_slot = self.calendar_service.first_available_slot(search_date, busy_times, duration_minutes)
+                if next_slot:
+                    return f"🔍 Next available slot: {next_slot} on {_fmt_date(search_date)}"
             
             return "❌ No available slots found in the next 7 days. Please try a different time range."
             
         except Exception as e:
-            logger.error(f"Error finding next available slot: {e}")
-            return f"❌ I couldn't find the next available slot due to an error: {str(e)}"
\ No newline at end of file
+            logger.exception("Error finding next available slot")
+            return _error_reply(_ERR_NEXT_SLOT, e)
+    
+    def _cache_get(self, cache: Dict, key: Tuple) -> Any:
+        """Return a cached value if caching is enabled and the entry is fresh"""
+        if not settings.ENABLE_CACHING:
+            return None
+        
+        entry = cache.get(key)
+        if not entry:
+            return None
+        
+        stored_at, value = entry
+        if time.monotonic() - stored_at > settings.CACHE_TTL:
+            cache.pop(key, None)
+            return None
+        
+        return value
+    
+    def _cache_set(self, cache: Dict, key: Tuple, value: Any) -> None:
+        """Store a value, evicting the oldest entry when the cache is full"""
+        if not settings.ENABLE_CACHING:
+            return
+        
+        if len(cache) >= _CACHE_MAXSIZE:
+            cache.pop(next(iter(cache)))
+        cache[key] = (time.monotonic(), value)
+    
+    def _invalidate_day(self, day: date) -> None:
+        """Drop cached availability for a day after its calendar changes"""
+        for key in [key for key in self._availability_cache if key[0].date() == day]:
+            del self._availability_cache[key]
+    
+    def _clear_caches(self) -> None:
+        """Drop all cached availability"""
+        self._availability_cache.clear()
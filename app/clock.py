@@ -0,0 +1,23 @@
+import asyncio
+from datetime import datetime
+from typing import Optional
+
+# Refresh interval for the cached clock, in seconds
+_CLOCK_INTERVAL = 0.01
+
+# Latest cached time; None while the refresher task isn't running
+_now: Optional[datetime] = None
+
+def now() -> datetime:
+    """Return the current time, cached to ~10ms while the refresher runs"""
+    return _now or datetime.now()
+
+async def run_clock() -> None:
+    """Keep the cached time fresh until the task is cancelled"""
+    global _now
+    try:
+        while True:
+            _now = datetime.now()
+            await asyncio.sleep(_CLOCK_INTERVAL)
+    finally:
+        _now = None
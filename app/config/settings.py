@@ -1,82 +1,125 @@
-import os
-from dotenv import load_dotenv
-
-# Load .env file
-load_dotenv()
-
-class Settings:
-    def __init__(self):
-        # === API & Server Configuration ===
-        self.API_TITLE = os.getenv("API_TITLE", "Calendar Booking Agent API")
-        self.API_VERSION = os.getenv("API_VERSION", "1.0.0")
-        self.HOST = os.getenv("HOST", "0.0.0.0")
-        self.PORT = int(os.getenv("PORT", 8000))
-        self.DEBUG = os.getenv("DEBUG", "false").lower() == "true"
-
-        # === LLM Configuration ===
-        self.GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-        self.MODEL_NAME = os.getenv("MODEL_NAME", "gemini-pro")
-        self.MODEL_TEMPERATURE = float(os.getenv("MODEL_TEMPERATURE", "0.3"))
-        self.MAX_TOKENS = int(os.getenv("MAX_TOKENS", 2048))
-
-        # === Google Calendar ===
-        self.GOOGLE_APPLICATION_CREDENTIALS = os.getenv("GOOGLE_APPLICATION_CREDENTIALS", "./credentials/service-account-key.json")
-        self.CALENDAR_ID = os.getenv("CALENDAR_ID")
-        self.CALENDAR_TIMEZONE = os.getenv("CALENDAR_TIMEZONE", "UTC")
-
-        # === CORS ===
-        self.CORS_ORIGINS = [origin.strip() for origin in os.getenv("CORS_ORIGINS", "*").split(",")]
-
-        # === Business Hours ===
-        self.BUSINESS_START_HOUR = int(os.getenv("BUSINESS_START_HOUR", 9))
-        self.BUSINESS_END_HOUR = int(os.getenv("BUSINESS_END_HOUR", 17))
-        self.BUSINESS_DAYS = [int(day.strip()) for day in os.getenv("BUSINESS_DAYS", "0,1,2,3,4").split(",")]
-
-        # === Appointment ===
-        self.DEFAULT_APPOINTMENT_DURATION = int(os.getenv("DEFAULT_APPOINTMENT_DURATION", 60))
-        self.MIN_APPOINTMENT_DURATION = int(os.getenv("MIN_APPOINTMENT_DURATION", 15))
-        self.MAX_APPOINTMENT_DURATION = int(os.getenv("MAX_APPOINTMENT_DURATION", 480))
-        self.BOOKING_BUFFER_MINUTES = int(os.getenv("BOOKING_BUFFER_MINUTES", 15))
-
-        # === Availability ===
-        self.MAX_SUGGESTIONS = int(os.getenv("MAX_SUGGESTIONS", 10))
-        self.AVAILABILITY_SEARCH_DAYS = int(os.getenv("AVAILABILITY_SEARCH_DAYS", 30))
-
-        # === Logging ===
-        self.LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
-
-        # === Security ===
-        self.SECRET_KEY = os.getenv("SECRET_KEY", "your-super-secret-key")
-        self.ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
-
-        # === Rate Limiting ===
-        self.RATE_LIMIT_REQUESTS = int(os.getenv("RATE_LIMIT_REQUESTS", 100))
-        self.RATE_LIMIT_WINDOW = int(os.getenv("RATE_LIMIT_WINDOW", 60))
-
-        # === Agent Info ===
-        self.AGENT_NAME = os.getenv("AGENT_NAME", "Calendar Assistant")
-        self.AGENT_DESCRIPTION = os.getenv(
-            "AGENT_DESCRIPTION",
-            "I'm your calendar assistant. I can help you book appointments, check availability, and manage your schedule."
-        )
-
-        # === Features ===
-        self.ENABLE_BOOKING = os.getenv("ENABLE_BOOKING", "true").lower() == "true"
-        self.ENABLE_CANCELLATION = os.getenv("ENABLE_CANCELLATION", "true").lower() == "true"
-        self.ENABLE_MODIFICATION = os.getenv("ENABLE_MODIFICATION", "true").lower() == "true"
-        self.ENABLE_NOTIFICATIONS = os.getenv("ENABLE_NOTIFICATIONS", "false").lower() == "true"
-        self.ENABLE_CACHING = os.getenv("ENABLE_CACHING", "true").lower() == "true"
-
-        # === Cache ===
-        self.CACHE_TTL = int(os.getenv("CACHE_TTL", 300))
-
-        # === Development ===
-        self.MOCK_CALENDAR = os.getenv("MOCK_CALENDAR", "false").lower() == "true"
-        self.SAVE_CONVERSATIONS = os.getenv("SAVE_CONVERSATIONS", "false").lower() == "true"
-
-        # === Optional ===
-        self.NOTIFICATION_EMAIL = os.getenv("NOTIFICATION_EMAIL")
-        self.DATABASE_URL = os.getenv("DATABASE_URL")
+from typing import Annotated, FrozenSet, List, Optional
+from pydantic import field_validator
+from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
+
+class Settings(BaseSettings):
+    # Values are read from the environment / .env once and are immutable afterwards
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        case_sensitive=True,
+        frozen=True,
+        extra="ignore"
+    )
+
+    # === API & Server Configuration ===
+    API_TITLE: str = "Calendar Booking Agent API"
+    API_VERSION: str = "1.0.0"
+    HOST: str = "0.0.0.0"
+    PORT: int = 8000
+    DEBUG: bool = False
+
+    # === LLM Configuration ===
+    GOOGLE_API_KEY: Optional[str] = None
+    MODEL_NAME: str = "gemini-pro"
+    CLASSIFIER_MODEL_NAME: str = "gemini-1.5-flash-8b"
+    MODEL_TEMPERATURE: float = 0.3
+    MAX_TOKENS: int = 2048
+
+    # === Google Calendar ===
+    GOOGLE_APPLICATION_CREDENTIALS: str = "./credentials/service-account-key.json"
+    CALENDAR_ID: Optional[str] = None
+    CALENDAR_TIMEZONE: str = "UTC"
+    CALENDAR_HTTP_TIMEOUT: int = 10
+
+    # === CORS ===
+    CORS_ORIGINS: Annotated[List[str], NoDecode] = ["*"]
+
+    # === Business Hours ===
+    BUSINESS_START_HOUR: int = 9
+    BUSINESS_END_HOUR: int = 17
+    BUSINESS_DAYS: Annotated[FrozenSet[int], NoDecode] = frozenset({0, 1, 2, 3, 4})
+
+    # === Appointment ===
+    DEFAULT_APPOINTMENT_DURATION: int = 60
+    MIN_APPOINTMENT_DURATION: int = 15
+    MAX_APPOINTMENT_DURATION: int = 480
+    BOOKING_BUFFER_MINUTES: int = 15
+    APPOINTMENTS_PAGE_SIZE: int = 25
+
+    # === Availability ===
+    MAX_SUGGESTIONS: int = 10
+    AVAILABILITY_SEARCH_DAYS: int = 30
+
+    # === Logging ===
+    LOG_LEVEL: str = "INFO"
+
+    # === Security ===
+    SECRET_KEY: str = "your-super-secret-key"
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+
+    # === Rate Limiting ===
+    RATE_LIMIT_REQUESTS: int = 100
+    RATE_LIMIT_WINDOW: int = 60
+
+    # === Agent Info ===
+    AGENT_NAME: str = "Calendar Assistant"
+    AGENT_DESCRIPTION: str = (
+        "I'm your calendar assistant. I can help you book appointments, check availability, and manage your schedule."
+    )
+
+    # === Features ===
+    ENABLE_BOOKING: bool = True
+    ENABLE_CANCELLATION: bool = True
+    ENABLE_MODIFICATION: bool = True
+    ENABLE_NOTIFICATIONS: bool = False
+    ENABLE_CACHING: bool = True
+    # Serve upcoming appointments from a synced mirror. The first sync in each worker
+    # lists the calendar's entire history (recurring events expanded) before answering
+    ENABLE_INCREMENTAL_SYNC: bool = False
+
+    # === Cache ===
+    CACHE_TTL: int = 300
+    # Optional shared cache for multi-worker deployments (needs the redis package)
+    REDIS_URL: Optional[str] = None
+    # Seconds to wait on Redis before treating the lookup as a cache miss
+    REDIS_TIMEOUT: float = 0.25
+
+    # === Development ===
+    MOCK_CALENDAR: bool = False
+    SAVE_CONVERSATIONS: bool = False
+
+    # === Optional ===
+    NOTIFICATION_EMAIL: Optional[str] = None
+    DATABASE_URL: Optional[str] = None
+
+    @field_validator("CORS_ORIGINS", mode="before")
+    @classmethod
+    def _split_origins(cls, value):
+        """Accept comma-separated origins from the environment"""
+        if isinstance(value, str):
+            return [origin.strip() for origin in value.split(",")]
+        return value
+
+    @field_validator("BUSINESS_DAYS", mode="before")
+    @classmethod
+    def _split_days(cls, value):
+        """Accept comma-separated weekday numbers from the environment"""
+        if isinstance(value, str):
+            return [int(day.strip()) for day in value.split(",")]
+        return value
+
+    @field_validator(
+        "DEBUG", "ENABLE_BOOKING", "ENABLE_CANCELLATION", "ENABLE_MODIFICATION",
+        "ENABLE_NOTIFICATIONS", "ENABLE_CACHING", "ENABLE_INCREMENTAL_SYNC",
+        "MOCK_CALENDAR", "SAVE_CONVERSATIONS",
+        mode="before"
+    )
+    @classmethod
+    def _parse_flag(cls, value):
+        """Treat any string other than 'true' as False, as the environment always has"""
+        if isinstance(value, str):
+            return value.lower() == "true"
+        return value
 
 # ✅ Export instance
 settings = Settings()
@@ -1,10 +1,18 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Optional
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict
+from typing import Optional, TYPE_CHECKING
+from contextlib import asynccontextmanager
+import asyncio
 import logging
 import os
 from datetime import datetime
+from app.clock import now, run_clock
+from app.config.settings import settings
+
+if TYPE_CHECKING:
+    from app.agent.calendar_agent import CalendarAgent
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -12,50 +20,67 @@ logger = logging.getLogger(__name__)
 
 # Pydantic models
 class ChatMessage(BaseModel):
+    model_config = ConfigDict(extra='forbid')
+    
     content: str
     timestamp: Optional[datetime] = None
 
 class ChatResponse(BaseModel):
+    model_config = ConfigDict(validate_assignment=False, validate_default=False, extra='ignore')
+    
     response: str
     timestamp: datetime
 
 class BookingRequest(BaseModel):
+    model_config = ConfigDict(extra='forbid')
+    
     title: str
     date: str
     time: str
     duration: Optional[int] = 60  # minutes
     description: Optional[str] = ""
 
+# Initialized by the lifespan handler before the app accepts requests
+calendar_agent: "CalendarAgent"
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global calendar_agent
+    clock_task = asyncio.create_task(run_clock())
+    try:
+        from app.services.calendar_service import get_calendar_service
+        from app.agent.calendar_agent import CalendarAgent
+        get_calendar_service()
+        calendar_agent = CalendarAgent()
+        logger.info("Calendar agent initialized successfully")
+    except Exception as e:
+        logger.error(f"Failed to initialize calendar agent: {e}")
+        clock_task.cancel()
+        raise
+    
+    yield
+    
+    clock_task.cancel()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Calendar Booking Agent API",
     description="AI-powered calendar booking agent with natural language processing",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Configure for production
-    allow_credentials=True,
+    allow_origins=settings.CORS_ORIGINS,
+    # Credentialed requests cannot use a wildcard origin
+    allow_credentials="*" not in settings.CORS_ORIGINS,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
-# Initialize agent (will be imported)
-calendar_agent = None
-
-@app.on_event("startup")
-async def startup_event():
-    global calendar_agent
-    try:
-        from app.agent.calendar_agent import CalendarAgent
-        calendar_agent = CalendarAgent()
-        logger.info("Calendar agent initialized successfully")
-    except Exception as e:
-        logger.error(f"Failed to initialize calendar agent: {e}")
-        raise
-
 @app.get("/")
 async def root():
     return {"message": "Calendar Booking Agent API", "status": "running"}
@@ -66,15 +91,12 @@ async def chat(message: ChatMessage):
     Process chat message and return agent response
     """
     try:
-        if not calendar_agent:
-            raise HTTPException(status_code=500, detail="Agent not initialized")
-        
         logger.info(f"Processing message: {message.content}")
         response = await calendar_agent.process_message(message.content)
         
         return ChatResponse(
             response=response,
-            timestamp=datetime.now()
+            timestamp=now()
         )
     except Exception as e:
         logger.error(f"Chat error: {e}")
@@ -86,9 +108,6 @@ async def book_appointment(booking: BookingRequest):
     Direct booking endpoint
     """
     try:
-        if not calendar_agent:
-            raise HTTPException(status_code=500, detail="Agent not initialized")
-        
         # Format booking request as natural language
         booking_message = f"Book an appointment titled '{booking.title}' on {booking.date} at {booking.time} for {booking.duration} minutes"
         if booking.description:
@@ -108,8 +127,8 @@ async def health_check():
     """
     return {
         "status": "healthy",
-        "timestamp": datetime.now(),
-        "agent_status": "initialized" if calendar_agent else "not_initialized"
+        "timestamp": now(),
+        "agent_status": "initialized"
     }
 
 @app.get("/available-slots/{date}")
@@ -118,9 +137,6 @@ async def get_available_slots(date: str):
     Get available time slots for a specific date
     """
     try:
-        if not calendar_agent:
-            raise HTTPException(status_code=500, detail="Agent not initialized")
-        
         message = f"What times are available on {date}?"
         response = await calendar_agent.process_message(message)
         
@@ -1,23 +1,35 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Optional, List, Dict, Any, Literal, Tuple
+from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
+from app.clock import now
+
+# Request bodies reject unknown fields up front; responses skip revalidation
+_REQUEST_CONFIG = ConfigDict(extra='forbid')
+_RESPONSE_CONFIG = ConfigDict(validate_assignment=False, validate_default=False, extra='ignore')
 
 class ChatMessage(BaseModel):
     """Chat message model for user input"""
+    model_config = _REQUEST_CONFIG
+    
     content: str = Field(..., description="User message content")
-    timestamp: Optional[datetime] = Field(default_factory=datetime.now)
+    timestamp: Optional[datetime] = Field(default_factory=now)
     user_id: Optional[str] = Field(None, description="Optional user identifier")
 
 class ChatResponse(BaseModel):
     """Chat response model"""
+    model_config = _RESPONSE_CONFIG
+    
     response: str = Field(..., description="Agent response")
-    timestamp: datetime = Field(default_factory=datetime.now)
+    timestamp: datetime = Field(default_factory=now)
     intent: Optional[str] = Field(None, description="Detected intent")
     entities: Optional[Dict[str, Any]] = Field(None, description="Extracted entities")
 
 class BookingRequest(BaseModel):
     """Direct booking request model"""
+    model_config = _REQUEST_CONFIG
+    
     title: str = Field(..., description="Appointment title")
     date: str = Field(..., description="Appointment date (YYYY-MM-DD)")
     time: str = Field(..., description="Appointment time (HH:MM)")
@@ -27,6 +39,8 @@ class BookingRequest(BaseModel):
 
 class AvailabilityRequest(BaseModel):
     """Availability check request model"""
+    model_config = _REQUEST_CONFIG
+    
     date: str = Field(..., description="Date to check (YYYY-MM-DD)")
     time: str = Field(..., description="Time to check (HH:MM)")
     duration: Optional[int] = Field(60, description="Duration in minutes")
@@ -47,6 +61,16 @@ class Appointment(BaseModel):
     attendees: Optional[List[str]] = Field(None, description="List of attendees")
     location: Optional[str] = Field(None, description="Meeting location")
 
+@dataclass(frozen=True, slots=True)
+class AppointmentSummary:
+    """Lightweight appointment record returned by the calendar service"""
+    id: Optional[str]
+    title: str
+    start_time: str
+    description: str
+    location: str
+    attendees: Tuple[str, ...]
+
 class AppointmentStatus(str, Enum):
     """Appointment status enumeration"""
     CONFIRMED = "confirmed"
@@ -64,6 +88,30 @@ class CalendarEvent(BaseModel):
     location: Optional[str] = Field(None, description="Event location")
     status: AppointmentStatus = Field(AppointmentStatus.CONFIRMED, description="Event status")
 
+Intent = Literal[
+    "book_appointment",
+    "check_availability",
+    "suggest_times",
+    "cancel_appointment",
+    "modify_appointment",
+    "list_appointments",
+    "general_query",
+]
+
+class Entities(BaseModel):
+    """Calendar entities extracted from a user message"""
+    title: Optional[str] = Field(None, description="Appointment title/subject")
+    date: Optional[str] = Field(None, description="Date (YYYY-MM-DD)")
+    time: Optional[str] = Field(None, description="Time (HH:MM, 24-hour)")
+    duration: Optional[int] = Field(None, description="Duration in minutes")
+    description: Optional[str] = Field(None, description="Additional details")
+    participant: Optional[str] = Field(None, description="Other people mentioned")
+
+class Analysis(BaseModel):
+    """Combined intent and entity analysis of a user message"""
+    intent: Intent = Field(..., description="Detected intent")
+    entities: Entities = Field(default_factory=Entities, description="Extracted entities")
+
 class AgentState(BaseModel):
     """Agent state model for LangGraph"""
     user_message: str = Field(..., description="User input message")
@@ -75,19 +123,25 @@ class AgentState(BaseModel):
 
 class HealthCheck(BaseModel):
     """Health check response model"""
+    model_config = _RESPONSE_CONFIG
+    
     status: str = Field(..., description="Service status")
-    timestamp: datetime = Field(default_factory=datetime.now)
+    timestamp: datetime = Field(default_factory=now)
     agent_status: str = Field(..., description="Agent initialization status")
     calendar_connected: bool = Field(..., description="Calendar connection status")
 
 class ErrorResponse(BaseModel):
     """Error response model"""
+    model_config = _RESPONSE_CONFIG
+    
     error: str = Field(..., description="Error message")
     detail: Optional[str] = Field(None, description="Detailed error information")
-    timestamp: datetime = Field(default_factory=datetime.now)
+    timestamp: datetime = Field(default_factory=now)
 
 class SuccessResponse(BaseModel):
     """Success response model"""
+    model_config = _RESPONSE_CONFIG
+    
     message: str = Field(..., description="Success message")
     data: Optional[Dict[str, Any]] = Field(None, description="Additional data")
-    timestamp: datetime = Field(default_factory=datetime.now)
\ No newline at end of file
+    timestamp: datetime = Field(default_factory=now)
\ No newline at end of file
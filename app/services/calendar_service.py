@@ -1,72 +1,171 @@
 from google.oauth2 import service_account
-from googleapiclient.discovery import build
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
 from googleapiclient.errors import HttpError
-from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from googleapiclient.model import JsonModel
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, date as _date, timedelta, timezone
+from typing import List, Dict, Any, Optional, Tuple
+from zoneinfo import ZoneInfo
+import asyncio
+import bisect
+import functools
+import httplib2
 import logging
+import orjson
+import threading
+import time
 from app.config.settings import settings
+from app.models import AppointmentSummary
+
+try:
+    import redis
+except ImportError:  # Optional: only needed when REDIS_URL is set
+    redis = None
 
 logger = logging.getLogger(__name__)
 import json
 import os
 from dotenv import load_dotenv
 load_dotenv(override=True)  # Load environment variables from .env file
+
+# Calendar API limit on calls per batch request
+_BATCH_LIMIT = 50
+
+# Maximum entries in the in-process day cache
+_CACHE_MAXSIZE = 1024
+
+# Bit n set when weekday n (Monday = 0) is a business day; settings are frozen
+_BUSINESS_DAY_MASK = sum(1 << day for day in settings.BUSINESS_DAYS)
+
+def _is_business_day(date: datetime) -> bool:
+    """Check a date's weekday against the business-day mask"""
+    return bool((_BUSINESS_DAY_MASK >> date.weekday()) & 1)
+
+# Concurrent per-day lookups, kept low for the Calendar API per-user rate limit
+_FANOUT_LIMIT = 8
+
+# Unit of the integer slot grid
+_MINUTE = timedelta(minutes=1)
+
+# Naive datetimes are treated as UTC at the API boundary
+_UTC = timezone.utc
+# Slot times shown to users
+_SLOT_FMT = '%I:%M %p'
+# Upcoming appointment times shown to users
+_UPCOMING_FMT = '%B %d, %Y at %I:%M %p'
+
+def _rfc3339(dt: datetime) -> str:
+    """Format a datetime as RFC 3339, treating naive values as UTC"""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=_UTC)
+    return dt.isoformat(timespec='seconds')
+
+# Partial-response masks limiting listings to the fields each caller reads
+_SLOT_EVENT_FIELDS = 'items(id,summary,status)'
+_APPOINTMENT_FIELDS = 'items(id,summary,start,description,location,attendees/email,status)'
+_APPOINTMENT_PAGE_FIELDS = f'nextPageToken,{_APPOINTMENT_FIELDS}'
+
+# Incremental sync listings carry the appointment fields plus end times and paging/sync tokens
+_SYNC_FIELDS = 'nextPageToken,nextSyncToken,items(id,summary,start,end,description,location,attendees/email,status)'
+_SYNC_PAGE_SIZE = 2500
+
+# Shared pool for the async variants; bounds threads (and so open connections)
+_EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix="calendar")
+# Long-lived fan-out threads for get_available_slots_multi, keeping their transports warm;
+# separate from _EXECUTOR so a lookup running there never waits on its own pool
+_FANOUT_EXECUTOR = ThreadPoolExecutor(max_workers=_FANOUT_LIMIT, thread_name_prefix="calendar-fanout")
+
+@functools.lru_cache(maxsize=None)
+def _discovery_document(service_name: str, version: str) -> Dict[str, Any]:
+    """Load and parse the discovery document bundled with the client library once"""
+    document = get_static_doc(service_name, version)
+    if document is None:
+        raise ValueError(f"No bundled discovery document for {service_name} {version}")
+    return json.loads(document)
+
+@functools.lru_cache(maxsize=1)
+def _service_account_credentials() -> service_account.Credentials:
+    """Parse the service account credentials from the environment once per process"""
+    # ✅ Read JSON credentials from env variable
+    service_account_json = os.getenv("GOOGLE_SERVICE_ACCOUNT_JSON")
+
+    if not service_account_json:
+        raise ValueError("GOOGLE_SERVICE_ACCOUNT_JSON is not set in environment variables.")
+
+    return service_account.Credentials.from_service_account_info(
+        json.loads(service_account_json),
+        scopes=["https://www.googleapis.com/auth/calendar"]
+    )
+
+class _OrjsonModel(JsonModel):
+    """JsonModel that decodes response bodies with orjson"""
+    
+    def deserialize(self, content):
+        """Decode a response body, returning non-JSON bodies as text like JsonModel"""
+        try:
+            body = orjson.loads(content)
+        except orjson.JSONDecodeError:
+            return content.decode("utf-8") if isinstance(content, bytes) else content
+        if self._data_wrapper and "data" in body:
+            body = body["data"]
+        return body
+
 class GoogleCalendarService:
     """Enhanced Google Calendar Service with comprehensive functionality"""
     
     def __init__(self):
         """Initialize Google Calendar service"""
         try:
-            # ✅ Read JSON credentials from env variable
-            service_account_json = os.getenv("GOOGLE_SERVICE_ACCOUNT_JSON")
-
-            if not service_account_json:
-                raise ValueError("GOOGLE_SERVICE_ACCOUNT_JSON is not set in environment variables.")
-
-            credentials_dict = json.loads(service_account_json)
-
-            self.credentials = service_account.Credentials.from_service_account_info(
-                credentials_dict,
-                scopes=["https://www.googleapis.com/auth/calendar"]
+            self.credentials = _service_account_credentials()
+            self.service = build_from_document(
+                _discovery_document("calendar", "v3"),
+                credentials=self.credentials,
+                model=_OrjsonModel()
             )
-            self.service = build("calendar", "v3", credentials=self.credentials)
             self.calendar_id = settings.CALENDAR_ID
+            # One keep-alive transport per worker thread, created on first use
+            self._local = threading.local()
+            # Worker threads share the cache below, so all access goes through the lock
+            self._cache_lock = threading.Lock()
+            # (ISO day, 'events' or 'slots:<duration>') -> (stored_at, value)
+            self._day_cache: Dict[Tuple[str, str], Tuple[float, Any]] = {}
+            # Shared across worker processes when configured; replaces the local cache
+            self._redis = self._connect_redis()
+            # Local mirror of the calendar kept current with incremental sync:
+            # event id -> (aware start, aware end, event)
+            self._sync_lock = threading.Lock()
+            self._sync_token: Optional[str] = None
+            self._synced_events: Dict[str, Tuple[datetime, datetime, Dict[str, Any]]] = {}
             logger.info("✅ Google Calendar service initialized successfully")
         except Exception as e:
             logger.error(f"❌ Failed to initialize Google Calendar service: {e}")
             raise
 
+    def _http(self) -> AuthorizedHttp:
+        """Return this thread's authorized transport, since httplib2 is not thread-safe"""
+        http = getattr(self._local, 'http', None)
+        if http is None:
+            http = AuthorizedHttp(self.credentials, http=httplib2.Http(timeout=settings.CALENDAR_HTTP_TIMEOUT))
+            self._local.http = http
+        return http
+    
     def test_connection(self) -> bool:
         """Test calendar connection"""
         try:
             # Try to get calendar info
-            calendar = self.service.calendars().get(calendarId=self.calendar_id).execute()
+            calendar = self.service.calendars().get(calendarId=self.calendar_id, fields='summary').execute(http=self._http())
             logger.info(f"Calendar connection test successful: {calendar.get('summary', 'Unknown')}")
             return True
         except Exception as e:
             logger.error(f"Calendar connection test failed: {e}")
             return False
     
-    def check_availability(self, start_time: datetime, end_time: datetime) -> bool:
-        """Check if a time slot is available"""
+    def check_availability(self, start_time: datetime, end_time: datetime) -> Optional[bool]:
+        """Check if a time slot is available, or return None if the lookup failed"""
         try:
-            # Convert to ISO format with timezone
-            start_iso = start_time.isoformat()
-            end_iso = end_time.isoformat()
-            
-            # Add 'Z' suffix if no timezone info
-            if start_time.tzinfo is None:
-                start_iso += 'Z'
-            if end_time.tzinfo is None:
-                end_iso += 'Z'
-            
-            events_result = self.service.events().list(
-                calendarId=self.calendar_id,
-                timeMin=start_iso,
-                timeMax=end_iso,
-                singleEvents=True,
-                orderBy='startTime'
-            ).execute()
+            events_result = self._slot_events_request(start_time, end_time).execute(http=self._http())
             
             events = events_result.get('items', [])
             
@@ -81,61 +180,56 @@ class GoogleCalendarService:
             
         except HttpError as e:
             logger.error(f"HTTP error checking availability: {e}")
-            return False
+            return None
         except Exception as e:
             logger.error(f"Error checking availability: {e}")
-            return False
+            return None
+    
+    def check_availability_bulk(self, slots: List[Tuple[datetime, datetime]]) -> List[Optional[bool]]:
+        """Check several time slots in one batched round-trip, returning availability per slot (None where the lookup failed)"""
+        try:
+            results = self.execute_batch([self._slot_events_request(start, end) for start, end in slots])
+        except Exception as e:
+            logger.error(f"Error checking availability in bulk: {e}")
+            return [None] * len(slots)
+        
+        availability = []
+        for (start_time, end_time), result in zip(slots, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error checking availability for {start_time}: {result}")
+                availability.append(None)
+                continue
+            availability.append(not any(event.get('status') != 'cancelled' for event in result.get('items', [])))
+        
+        return availability
+    
+    def _slot_events_request(self, start_time: datetime, end_time: datetime):
+        """Build the events list request for a single time slot"""
+        start_iso = _rfc3339(start_time)
+        end_iso = _rfc3339(end_time)
+        
+        return self.service.events().list(
+            calendarId=self.calendar_id,
+            timeMin=start_iso,
+            timeMax=end_iso,
+            singleEvents=True,
+            orderBy='startTime',
+            fields=_SLOT_EVENT_FIELDS
+        )
     
     def create_event(self, title: str, start_time: datetime, end_time: datetime, 
                     description: str = "", attendees: List[str] = None, 
                     location: str = None) -> Dict[str, Any]:
         """Create a calendar event"""
         try:
-            # Convert to ISO format with timezone
-            start_iso = start_time.isoformat()
-            end_iso = end_time.isoformat()
-            
-            # Add 'Z' suffix if no timezone info
-            if start_time.tzinfo is None:
-                start_iso += 'Z'
-            if end_time.tzinfo is None:
-                end_iso += 'Z'
-            
-            event = {
-                'summary': title,
-                'description': description,
-                'start': {
-                    'dateTime': start_iso,
-                    'timeZone': settings.CALENDAR_TIMEZONE,
-                },
-                'end': {
-                    'dateTime': end_iso,
-                    'timeZone': settings.CALENDAR_TIMEZONE,
-                },
-            }
-            
-            # Add attendees if provided
-            if attendees:
-                event['attendees'] = [{'email': email} for email in attendees]
-            
-            # Add location if provided
-            if location:
-                event['location'] = location
-            
-            # Add reminders
-            event['reminders'] = {
-                'useDefault': False,
-                'overrides': [
-                    {'method': 'email', 'minutes': 24 * 60},  # 24 hours
-                    {'method': 'popup', 'minutes': 10},       # 10 minutes
-                ],
-            }
+            event = self._event_body(title, start_time, end_time, description, attendees, location)
             
             created_event = self.service.events().insert(
                 calendarId=self.calendar_id, 
                 body=event,
                 sendUpdates="all" ,
-            ).execute()
+            ).execute(http=self._http())
+            self._invalidate_date(start_time)
             logger.info(f"Event created successfully: {created_event}")
             logger.info(f"Event created successfully: {created_event.get('id')}")
             return created_event
@@ -147,158 +241,445 @@ class GoogleCalendarService:
             logger.error(f"Error creating event: {e}")
             raise
     
+    def create_events_bulk(self, events: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """Create several events in one batched round-trip
+        
+        Each entry takes create_event's keyword arguments. Returns the created
+        event per entry, or None where that insert failed.
+        """
+        requests = [
+            self.service.events().insert(
+                calendarId=self.calendar_id,
+                body=self._event_body(**event),
+                sendUpdates="all"
+            )
+            for event in events
+        ]
+        
+        created_events = []
+        for event, result in zip(events, self.execute_batch(requests)):
+            if isinstance(result, Exception):
+                logger.error(f"Error creating event '{event.get('title')}': {result}")
+                created_events.append(None)
+                continue
+            created_events.append(result)
+            self._invalidate_date(event['start_time'])
+        
+        logger.info(f"Created {sum(1 for event in created_events if event)} of {len(events)} events")
+        return created_events
+    
+    def _event_body(self, title: str, start_time: datetime, end_time: datetime, 
+                    description: str = "", attendees: List[str] = None, 
+                    location: str = None) -> Dict[str, Any]:
+        """Build the event resource for an insert request"""
+        start_iso = _rfc3339(start_time)
+        end_iso = _rfc3339(end_time)
+        
+        event = {
+            'summary': title,
+            'description': description,
+            'start': {
+                'dateTime': start_iso,
+                'timeZone': settings.CALENDAR_TIMEZONE,
+            },
+            'end': {
+                'dateTime': end_iso,
+                'timeZone': settings.CALENDAR_TIMEZONE,
+            },
+        }
+        
+        # Add attendees if provided
+        if attendees:
+            event['attendees'] = [{'email': email} for email in attendees]
+        
+        # Add location if provided
+        if location:
+            event['location'] = location
+        
+        # Add reminders
+        event['reminders'] = {
+            'useDefault': False,
+            'overrides': [
+                {'method': 'email', 'minutes': 24 * 60},  # 24 hours
+                {'method': 'popup', 'minutes': 10},       # 10 minutes
+            ],
+        }
+        
+        return event
+    
+    def book_event_if_free(self, title: str, start_time: datetime, end_time: datetime, 
+                           description: str = "", attendees: List[str] = None, 
+                           location: str = None) -> Optional[Dict[str, Any]]:
+        """Create an event unless the slot is taken, listing and inserting in one batch
+        
+        Returns the created event, or None when another event overlaps the slot
+        (the new event is deleted again in that case). Raises if either call
+        fails; a failed listing also rolls the new event back.
+        """
+        listed, created = self.execute_batch([
+            self._slot_events_request(start_time, end_time),
+            self.service.events().insert(
+                calendarId=self.calendar_id,
+                body=self._event_body(title, start_time, end_time, description, attendees, location),
+                sendUpdates="all"
+            ),
+        ])
+        
+        if isinstance(created, Exception):
+            logger.error(f"Error creating event: {created}")
+            raise created
+        self._invalidate_date(start_time)
+        
+        # Without the listing the slot can't be confirmed free; that is an error, not a conflict
+        if isinstance(listed, Exception):
+            logger.error(f"Error checking availability, rolling back event {created.get('id')}: {listed}")
+            self._rollback_event(created['id'], start_time)
+            raise listed
+        
+        # The batch gives no ordering guarantee, so the listing may include the new event
+        conflicts = any(
+            event.get('status') != 'cancelled' and event.get('id') != created.get('id')
+            for event in listed.get('items', [])
+        )
+        if conflicts:
+            logger.info(f"Time slot conflict found, rolling back event: {created.get('id')}")
+            self._rollback_event(created['id'], start_time)
+            return None
+        
+        logger.info(f"Event created successfully: {created.get('id')}")
+        return created
+    
+    def _rollback_event(self, event_id: str, start_time: datetime) -> None:
+        """Delete an event created by book_event_if_free, notifying the attendees it invited"""
+        try:
+            self.service.events().delete(
+                calendarId=self.calendar_id,
+                eventId=event_id,
+                sendUpdates="all"
+            ).execute(http=self._http())
+        except Exception as e:
+            logger.error(f"Error rolling back event {event_id}: {e}")
+        self._invalidate_date(start_time)
+    
     def get_available_slots(self, date: datetime, duration_minutes: int = 60) -> List[str]:
         """Get available time slots for a given date"""
         try:
-            # Define business hours for the given date
-            start_of_day = date.replace(
-                hour=settings.BUSINESS_START_HOUR, 
-                minute=0, 
-                second=0, 
-                microsecond=0
-            )
-            end_of_day = date.replace(
-                hour=settings.BUSINESS_END_HOUR, 
-                minute=0, 
-                second=0, 
-                microsecond=0
-            )
-            
             # Check if it's a business day
-            if date.weekday() not in settings.BUSINESS_DAYS:
+            if not _is_business_day(date):
                 logger.info(f"Date {date.strftime('%Y-%m-%d')} is not a business day")
                 return []
             
-            # Get existing events for the day
-            start_iso = start_of_day.isoformat() + 'Z'
-            end_iso = end_of_day.isoformat() + 'Z'
+            cache_key = (date.date().isoformat(), f"slots:{duration_minutes}")
+            available_slots = self._cache_get(cache_key)
+            if available_slots is not None:
+                return available_slots
             
-            events_result = self.service.events().list(
-                calendarId=self.calendar_id,
-                timeMin=start_iso,
-                timeMax=end_iso,
-                singleEvents=True,
-                orderBy='startTime'
-            ).execute()
-            
-            events = events_result.get('items', [])
-            
-            # Filter out cancelled events and get busy times
-            busy_times = []
-            for event in events:
-                if event.get('status') != 'cancelled':
-                    event_start = self._parse_datetime(event['start'])
-                    event_end = self._parse_datetime(event['end'])
-                    if event_start and event_end:
-                        busy_times.append((event_start, event_end))
-            
-            # Sort busy times
-            busy_times.sort(key=lambda x: x[0])
-            
-            # Find available slots
-            available_slots = []
-            current_time = start_of_day
-            slot_duration = timedelta(minutes=duration_minutes)
-            buffer_duration = timedelta(minutes=settings.BOOKING_BUFFER_MINUTES)
-            
-            for busy_start, busy_end in busy_times:
-                # Check if there's enough time before this busy period
-                if (busy_start - current_time) >= (slot_duration + buffer_duration):
-                    # Add available slots before this busy period
-                    while (current_time + slot_duration + buffer_duration) <= busy_start:
-                        available_slots.append(current_time.strftime('%I:%M %p'))
-                        current_time += slot_duration
-                
-                # Move current time to after this busy period
-                current_time = max(current_time, busy_end + buffer_duration)
-            
-            # Check for slots after the last busy period
-            while (current_time + slot_duration) <= end_of_day:
-                available_slots.append(current_time.strftime('%I:%M %p'))
-                current_time += slot_duration
+            # Only busy ranges matter here, so skip the full event listing
+            start_of_day, end_of_day = self._business_hours(date)
+            busy_times = self.get_busy_intervals(start_of_day, end_of_day)
             
+            available_slots = self._slots_from_busy(date, busy_times, duration_minutes)
+            self._cache_set(cache_key, available_slots)
             logger.info(f"Found {len(available_slots)} available slots for {date.strftime('%Y-%m-%d')}")
-            return available_slots[:settings.MAX_SUGGESTIONS]
+            return available_slots
             
         except Exception as e:
             logger.error(f"Error getting available slots: {e}")
             return []
     
-    def get_appointments_for_date(self, date: datetime) -> List[Dict[str, Any]]:
+    def get_available_slots_multi(self, dates: List[datetime], duration_minutes: int = 60) -> Dict[_date, List[str]]:
+        """Get available time slots for several dates, looking each day up concurrently"""
+        results = _FANOUT_EXECUTOR.map(lambda date: self.get_available_slots(date, duration_minutes), dates)
+        return {date.date(): slots for date, slots in zip(dates, results)}
+    
+    def get_busy_intervals(self, start_time: datetime, end_time: datetime) -> List[Tuple[datetime, datetime]]:
+        """Get the calendar's busy intervals in a window with one freebusy query, sorted by start"""
+        start_iso = _rfc3339(start_time)
+        end_iso = _rfc3339(end_time)
+        
+        result = self.service.freebusy().query(body={
+            'timeMin': start_iso,
+            'timeMax': end_iso,
+            'timeZone': settings.CALENDAR_TIMEZONE,
+            'items': [{'id': self.calendar_id}]
+        }).execute(http=self._http())
+        
+        calendar = result.get('calendars', {}).get(self.calendar_id, {})
+        if calendar.get('errors'):
+            raise ValueError(f"Free/busy query failed: {calendar['errors']}")
+        
+        busy_times = []
+        for interval in calendar.get('busy', []):
+            busy_start = self._parse_datetime({'dateTime': interval['start']})
+            busy_end = self._parse_datetime({'dateTime': interval['end']})
+            if busy_start and busy_end:
+                busy_times.append((busy_start, busy_end))
+        
+        busy_times.sort(key=lambda x: x[0])
+        return busy_times
+    
+    def first_available_slot(self, date: datetime, busy_times: List[Tuple[datetime, datetime]], 
+                             duration_minutes: int = 60) -> Optional[str]:
+        """Find a date's first free slot given sorted, non-overlapping busy intervals"""
+        if not _is_business_day(date):
+            return None
+        
+        # Skip straight to the first interval still running at the start of business hours
+        start_of_day, _ = self._business_hours(date)
+        index = bisect.bisect_right(busy_times, start_of_day, key=lambda x: x[1])
+        slots = self._slots_from_busy(date, busy_times[index:], duration_minutes, limit=1)
+        return slots[0] if slots else None
+    
+    def _business_hours(self, date: datetime) -> Tuple[datetime, datetime]:
+        """Return the business-hours window for a given date"""
+        start_of_day = date.replace(
+            hour=settings.BUSINESS_START_HOUR, 
+            minute=0, 
+            second=0, 
+            microsecond=0
+        )
+        end_of_day = date.replace(
+            hour=settings.BUSINESS_END_HOUR, 
+            minute=0, 
+            second=0, 
+            microsecond=0
+        )
+        return start_of_day, end_of_day
+    
+    def _slots_from_busy(self, date: datetime, busy_times: List[Tuple[datetime, datetime]], duration_minutes: int, 
+                         limit: Optional[int] = None) -> List[str]:
+        """Compute free slots within a date's business hours from busy intervals sorted by start"""
+        start_of_day, end_of_day = self._business_hours(date)
+        if limit is None:
+            limit = settings.MAX_SUGGESTIONS
+        
+        # Work in whole minutes after opening time; busy edges round outwards
+        day_length = (end_of_day - start_of_day) // _MINUTE
+        buffer = settings.BOOKING_BUFFER_MINUTES
+        slot_starts: List[int] = []
+        current = 0
+        
+        for busy_start, busy_end in busy_times:
+            # Intervals outside business hours cannot block a slot
+            if busy_start >= end_of_day:
+                break
+            if busy_end <= start_of_day:
+                continue
+            
+            # Slots that end at least one buffer before this busy period
+            count = ((busy_start - start_of_day) // _MINUTE - current - buffer) // duration_minutes
+            if count > 0:
+                take = min(count, limit - len(slot_starts))
+                slot_starts.extend(range(current, current + take * duration_minutes, duration_minutes))
+                current += count * duration_minutes
+                if len(slot_starts) >= limit:
+                    break
+            
+            # Move current time to after this busy period
+            current = max(current, -((start_of_day - busy_end) // _MINUTE) + buffer)
+        
+        # Slots after the last busy period
+        count = min((day_length - current) // duration_minutes, limit - len(slot_starts))
+        if count > 0:
+            slot_starts.extend(range(current, current + count * duration_minutes, duration_minutes))
+        
+        return [(start_of_day + timedelta(minutes=minutes)).strftime(_SLOT_FMT) for minutes in slot_starts]
+
+    def _day_events(self, date: datetime) -> List[Dict[str, Any]]:
+        """Get a date's raw events, cached until the day changes"""
+        cache_key = (date.date().isoformat(), "events")
+        events = self._cache_get(cache_key)
+        if events is not None:
+            return events
+        
+        start_of_day = date.replace(hour=0, minute=0, second=0, microsecond=0)
+        end_of_day = date.replace(hour=23, minute=59, second=59, microsecond=999999)
+        
+        start_iso = _rfc3339(start_of_day)
+        end_iso = _rfc3339(end_of_day)
+        
+        events_result = self.service.events().list(
+            calendarId=self.calendar_id,
+            timeMin=start_iso,
+            timeMax=end_iso,
+            singleEvents=True,
+            orderBy='startTime',
+            fields=_APPOINTMENT_FIELDS
+        ).execute(http=self._http())
+        
+        events = events_result.get('items', [])
+        self._cache_set(cache_key, events)
+        return events
+    
+    def get_appointments_for_date(self, date: datetime) -> List[AppointmentSummary]:
         """Get appointments for a specific date"""
+        columns = self.get_appointments_for_date_columnar(date)
+        return [AppointmentSummary(*row) for row in zip(*columns.values())]
+    
+    def get_appointments_for_date_columnar(self, date: datetime) -> Dict[str, List[Any]]:
+        """Get appointments for a specific date as parallel per-field lists"""
+        try:
+            return self._columns(self._day_events(date), _SLOT_FMT)
+            
+        except Exception as e:
+            logger.error(f"Error getting appointments for date: {e}")
+            return self._columns([], _SLOT_FMT)
+    
+    def get_appointments_for_date_page(self, date: datetime, page_size: Optional[int] = None, 
+                                       page_token: Optional[str] = None) -> Tuple[List[AppointmentSummary], Optional[str]]:
+        """Get one page of a date's appointments, plus the token for the next page"""
         try:
             start_of_day = date.replace(hour=0, minute=0, second=0, microsecond=0)
             end_of_day = date.replace(hour=23, minute=59, second=59, microsecond=999999)
             
-            start_iso = start_of_day.isoformat() + 'Z'
-            end_iso = end_of_day.isoformat() + 'Z'
-            
             events_result = self.service.events().list(
                 calendarId=self.calendar_id,
-                timeMin=start_iso,
-                timeMax=end_iso,
+                timeMin=_rfc3339(start_of_day),
+                timeMax=_rfc3339(end_of_day),
                 singleEvents=True,
-                orderBy='startTime'
-            ).execute()
+                orderBy='startTime',
+                maxResults=page_size or settings.APPOINTMENTS_PAGE_SIZE,
+                pageToken=page_token,
+                fields=_APPOINTMENT_PAGE_FIELDS
+            ).execute(http=self._http())
             
-            events = events_result.get('items', [])
-            appointments = []
-            
-            for event in events:
-                if event.get('status') != 'cancelled':
-                    start_time = self._parse_datetime(event['start'])
-                    appointments.append({
-                        'id': event.get('id'),
-                        'title': event.get('summary', 'Untitled'),
-                        'start_time': start_time.strftime('%I:%M %p') if start_time else 'Unknown',
-                        'description': event.get('description', ''),
-                        'location': event.get('location', ''),
-                        'attendees': [attendee.get('email', '') for attendee in event.get('attendees', [])]
-                    })
+            return self._summaries(events_result.get('items', []), _SLOT_FMT), events_result.get('nextPageToken')
             
+        except Exception as e:
+            logger.error(f"Error getting appointments for date: {e}")
+            return [], None
+    
+    def get_upcoming_appointments(self, days_ahead: int = 7) -> List[AppointmentSummary]:
+        """Get upcoming appointments, limited to the first page"""
+        if not settings.ENABLE_INCREMENTAL_SYNC:
+            appointments, _ = self.get_upcoming_appointments_page(days_ahead)
             return appointments
+        
+        try:
+            self._sync_events()
+            
+            # The mirror holds aware datetimes, so calendars outside UTC compare correctly
+            now = datetime.now(_UTC)
+            future_date = now + timedelta(days=days_ahead)
+            with self._sync_lock:
+                # Same window as timeMin/timeMax: anything still running after now
+                upcoming = [entry for entry in self._synced_events.values() if entry[1] > now and entry[0] < future_date]
+            upcoming.sort(key=lambda entry: entry[0])
+            
+            return self._summaries(
+                [event for _, _, event in upcoming[:settings.APPOINTMENTS_PAGE_SIZE]],
+                _UPCOMING_FMT
+            )
             
         except Exception as e:
-            logger.error(f"Error getting appointments for date: {e}")
+            logger.error(f"Error getting upcoming appointments: {e}")
             return []
     
-    def get_upcoming_appointments(self, days_ahead: int = 7) -> List[Dict[str, Any]]:
-        """Get upcoming appointments"""
+    def _sync_events(self) -> None:
+        """Bring the local event mirror up to date, fetching only changes after the first sync"""
+        with self._sync_lock:
+            full_sync = self._sync_token is None
+            if not full_sync:
+                try:
+                    self._sync_token = self._apply_event_pages(self._sync_token)
+                except HttpError as e:
+                    # 410 Gone: the token expired and a full sync is required
+                    if e.resp.status != 410:
+                        raise
+                    logger.info("Calendar sync token expired, running a full sync")
+                    full_sync = True
+            
+            if full_sync:
+                self._synced_events.clear()
+                self._sync_token = self._apply_event_pages(None)
+            
+            # Drop events that have ended so the mirror only holds what can still be upcoming;
+            # sync re-sends any past event that is edited later
+            now = datetime.now(_UTC)
+            for event_id in [event_id for event_id, entry in self._synced_events.items() if entry[1] <= now]:
+                del self._synced_events[event_id]
+    
+    def _apply_event_pages(self, sync_token: Optional[str]) -> Optional[str]:
+        """Apply every page of a full or incremental listing to the mirror, returning the next sync token"""
+        page_token = None
+        while True:
+            events_result = self.service.events().list(
+                calendarId=self.calendar_id,
+                singleEvents=True,
+                syncToken=sync_token,
+                pageToken=page_token,
+                maxResults=_SYNC_PAGE_SIZE,
+                fields=_SYNC_FIELDS
+            ).execute(http=self._http())
+            
+            for event in events_result.get('items', []):
+                start_time = self._parse_datetime(event.get('start', {}), keep_tz=True)
+                end_time = self._parse_datetime(event.get('end', {}), keep_tz=True)
+                if event.get('status') == 'cancelled' or start_time is None or end_time is None:
+                    self._synced_events.pop(event['id'], None)
+                else:
+                    self._synced_events[event['id']] = (start_time, end_time, event)
+            
+            page_token = events_result.get('nextPageToken')
+            if not page_token:
+                return events_result.get('nextSyncToken')
+    
+    def get_upcoming_appointments_page(self, days_ahead: int = 7, page_size: Optional[int] = None, 
+                                       page_token: Optional[str] = None) -> Tuple[List[AppointmentSummary], Optional[str]]:
+        """Get one page of upcoming appointments, plus the token for the next page"""
         try:
-            now = datetime.now()
+            now = datetime.now(_UTC)
             future_date = now + timedelta(days=days_ahead)
             
-            now_iso = now.isoformat() + 'Z'
-            future_iso = future_date.isoformat() + 'Z'
+            now_iso = _rfc3339(now)
+            future_iso = _rfc3339(future_date)
             
             events_result = self.service.events().list(
                 calendarId=self.calendar_id,
                 timeMin=now_iso,
                 timeMax=future_iso,
                 singleEvents=True,
-                orderBy='startTime'
-            ).execute()
+                orderBy='startTime',
+                maxResults=page_size or settings.APPOINTMENTS_PAGE_SIZE,
+                pageToken=page_token,
+                fields=_APPOINTMENT_PAGE_FIELDS
+            ).execute(http=self._http())
             
-            events = events_result.get('items', [])
-            appointments = []
-            
-            for event in events:
-                if event.get('status') != 'cancelled':
-                    start_time = self._parse_datetime(event['start'])
-                    appointments.append({
-                        'id': event.get('id'),
-                        'title': event.get('summary', 'Untitled'),
-                        'start_time': start_time.strftime('%B %d, %Y at %I:%M %p') if start_time else 'Unknown',
-                        'description': event.get('description', ''),
-                        'location': event.get('location', ''),
-                        'attendees': [attendee.get('email', '') for attendee in event.get('attendees', [])]
-                    })
-            
-            return appointments
+            return self._summaries(events_result.get('items', []), _UPCOMING_FMT), events_result.get('nextPageToken')
             
         except Exception as e:
             logger.error(f"Error getting upcoming appointments: {e}")
-            return []
+            return [], None
+    
+    def _summaries(self, events: List[Dict[str, Any]], time_format: str) -> List[AppointmentSummary]:
+        """Convert listed events to appointment summaries, skipping cancelled ones"""
+        return [AppointmentSummary(*row) for row in zip(*self._columns(events, time_format).values())]
+    
+    def _columns(self, events: List[Dict[str, Any]], time_format: str) -> Dict[str, List[Any]]:
+        """Split listed events into per-field lists in one pass, skipping cancelled ones
+        
+        Keys follow AppointmentSummary's field order, so rows zip straight into it.
+        """
+        ids, titles, start_times, descriptions, locations, attendees = [], [], [], [], [], []
+        
+        for event in events:
+            if event.get('status') != 'cancelled':
+                start_time = self._parse_datetime(event['start'])
+                ids.append(event.get('id'))
+                titles.append(event.get('summary', 'Untitled'))
+                start_times.append(start_time.strftime(time_format) if start_time else 'Unknown')
+                descriptions.append(event.get('description', ''))
+                locations.append(event.get('location', ''))
+                attendees.append(tuple(attendee.get('email', '') for attendee in event.get('attendees', [])))
+        
+        return {
+            'ids': ids,
+            'titles': titles,
+            'start_times': start_times,
+            'descriptions': descriptions,
+            'locations': locations,
+            'attendees': attendees,
+        }
     
     def cancel_event(self, event_id: str) -> bool:
         """Cancel an event"""
@@ -306,8 +687,10 @@ class GoogleCalendarService:
             self.service.events().delete(
                 calendarId=self.calendar_id,
                 eventId=event_id
-            ).execute()
+            ).execute(http=self._http())
             
+            # Only the ID is known here, so drop every cached day
+            self.invalidate_cache()
             logger.info(f"Event cancelled successfully: {event_id}")
             return True
             
@@ -325,7 +708,8 @@ class GoogleCalendarService:
             event = self.service.events().get(
                 calendarId=self.calendar_id,
                 eventId=event_id
-            ).execute()
+            ).execute(http=self._http())
+            original_start = self._parse_datetime(event.get('start', {}))
             
             # Update fields
             if 'title' in kwargs:
@@ -335,19 +719,13 @@ class GoogleCalendarService:
             if 'location' in kwargs:
                 event['location'] = kwargs['location']
             if 'start_time' in kwargs:
-                start_iso = kwargs['start_time'].isoformat()
-                if kwargs['start_time'].tzinfo is None:
-                    start_iso += 'Z'
                 event['start'] = {
-                    'dateTime': start_iso,
+                    'dateTime': _rfc3339(kwargs['start_time']),
                     'timeZone': settings.CALENDAR_TIMEZONE
                 }
             if 'end_time' in kwargs:
-                end_iso = kwargs['end_time'].isoformat()
-                if kwargs['end_time'].tzinfo is None:
-                    end_iso += 'Z'
                 event['end'] = {
-                    'dateTime': end_iso,
+                    'dateTime': _rfc3339(kwargs['end_time']),
                     'timeZone': settings.CALENDAR_TIMEZONE
                 }
             
@@ -356,7 +734,13 @@ class GoogleCalendarService:
                 calendarId=self.calendar_id,
                 eventId=event_id,
                 body=event
-            ).execute()
+            ).execute(http=self._http())
+            
+            # The event may have moved, so drop both its old and new days
+            if original_start:
+                self._invalidate_date(original_start)
+            if 'start_time' in kwargs:
+                self._invalidate_date(kwargs['start_time'])
             
             logger.info(f"Event updated successfully: {event_id}")
             return True
@@ -368,26 +752,240 @@ class GoogleCalendarService:
             logger.error(f"Error updating event: {e}")
             return False
     
-    def _parse_datetime(self, datetime_obj: Dict[str, Any]) -> Optional[datetime]:
-        """Parse datetime from Google Calendar API response"""
+    def execute_batch(self, requests: List[Any]) -> List[Any]:
+        """Execute API requests in as few batch round-trips as possible
+        
+        Returns one entry per request, in order: the response body, or the
+        exception raised for that request.
+        """
+        results: List[Any] = [None] * len(requests)
+        
+        def callback(request_id, response, exception):
+            results[int(request_id)] = exception if exception else response
+        
+        for offset in range(0, len(requests), _BATCH_LIMIT):
+            batch = self.service.new_batch_http_request(callback=callback)
+            for index, request in enumerate(requests[offset:offset + _BATCH_LIMIT], start=offset):
+                batch.add(request, request_id=str(index))
+            batch.execute(http=self._http())
+        
+        logger.info(f"Executed {len(requests)} requests in {-(-len(requests) // _BATCH_LIMIT)} batch(es)")
+        return results
+    
+    def _connect_redis(self):
+        """Connect to the shared cache if REDIS_URL is set and redis is installed"""
+        if not settings.REDIS_URL:
+            return None
+        if redis is None:
+            logger.warning("REDIS_URL is set but the redis package is not installed; using the in-process cache")
+            return None
+        # Short socket timeouts so a stalled or unreachable Redis degrades to cache misses
+        return redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=settings.REDIS_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_TIMEOUT
+        )
+    
+    def _redis_key(self, iso_day: str) -> str:
+        """Name of the Redis hash holding a day's cached entries"""
+        return f"gcal:{self.calendar_id}:{iso_day}"
+    
+    def _cache_get(self, key: Tuple[str, str]) -> Any:
+        """Return a cached value if caching is enabled and the entry is fresh"""
+        if not settings.ENABLE_CACHING:
+            return None
+        
+        if self._redis is not None:
+            try:
+                raw = self._redis.hget(self._redis_key(key[0]), key[1])
+            except redis.RedisError as e:
+                logger.warning(f"Redis cache read failed: {e}")
+                return None
+            if raw is None:
+                return None
+            stored_at, value = json.loads(raw)
+            return value if time.time() - stored_at <= settings.CACHE_TTL else None
+        
+        with self._cache_lock:
+            entry = self._day_cache.get(key)
+            if not entry:
+                return None
+            
+            stored_at, value = entry
+            if time.monotonic() - stored_at > settings.CACHE_TTL:
+                self._day_cache.pop(key, None)
+                return None
+            
+            return value
+    
+    def _cache_set(self, key: Tuple[str, str], value: Any) -> None:
+        """Store a value, evicting the oldest entry when the local cache is full"""
+        if not settings.ENABLE_CACHING:
+            return
+        
+        if self._redis is not None:
+            redis_key = self._redis_key(key[0])
+            try:
+                # Entries carry their own timestamp; the hash expiry only reclaims idle days
+                with self._redis.pipeline() as pipe:
+                    pipe.hset(redis_key, key[1], json.dumps([time.time(), value]))
+                    pipe.expire(redis_key, settings.CACHE_TTL)
+                    pipe.execute()
+            except redis.RedisError as e:
+                logger.warning(f"Redis cache write failed: {e}")
+            return
+        
+        with self._cache_lock:
+            if len(self._day_cache) >= _CACHE_MAXSIZE:
+                self._day_cache.pop(next(iter(self._day_cache)))
+            self._day_cache[key] = (time.monotonic(), value)
+    
+    def _invalidate_date(self, day: datetime) -> None:
+        """Drop cached slots and events for a day after its calendar changes"""
+        iso_day = day.date().isoformat()
+        if self._redis is not None:
+            try:
+                self._redis.delete(self._redis_key(iso_day))
+            except redis.RedisError as e:
+                logger.warning(f"Redis cache invalidation failed: {e}")
+            return
+        
+        with self._cache_lock:
+            for key in [key for key in self._day_cache if key[0] == iso_day]:
+                del self._day_cache[key]
+    
+    def invalidate_cache(self) -> None:
+        """Drop all cached slots and events; used by cancel_event, which only knows the event ID"""
+        if self._redis is not None:
+            try:
+                keys = list(self._redis.scan_iter(match=self._redis_key("*")))
+                if keys:
+                    self._redis.delete(*keys)
+            except redis.RedisError as e:
+                logger.warning(f"Redis cache invalidation failed: {e}")
+            return
+        
+        with self._cache_lock:
+            self._day_cache.clear()
+    
+    # Async variants: each runs the blocking call on the calendar thread pool,
+    # where every thread has its own transport, so the event loop stays free
+    
+    async def _run(self, func, *args, **kwargs) -> Any:
+        """Run a blocking service call on the bounded calendar thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_EXECUTOR, functools.partial(func, *args, **kwargs))
+    
+    async def atest_connection(self) -> bool:
+        """Async variant of test_connection"""
+        return await self._run(self.test_connection)
+    
+    async def acheck_availability(self, start_time: datetime, end_time: datetime) -> Optional[bool]:
+        """Async variant of check_availability"""
+        return await self._run(self.check_availability, start_time, end_time)
+    
+    async def acheck_availability_bulk(self, slots: List[Tuple[datetime, datetime]]) -> List[Optional[bool]]:
+        """Async variant of check_availability_bulk"""
+        return await self._run(self.check_availability_bulk, slots)
+    
+    async def acreate_event(self, title: str, start_time: datetime, end_time: datetime, 
+                            description: str = "", attendees: List[str] = None, 
+                            location: str = None) -> Dict[str, Any]:
+        """Async variant of create_event"""
+        return await self._run(self.create_event, title, start_time, end_time, description, attendees, location)
+    
+    async def acreate_events_bulk(self, events: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """Async variant of create_events_bulk"""
+        return await self._run(self.create_events_bulk, events)
+    
+    async def abook_event_if_free(self, title: str, start_time: datetime, end_time: datetime, 
+                                  description: str = "", attendees: List[str] = None, 
+                                  location: str = None) -> Optional[Dict[str, Any]]:
+        """Async variant of book_event_if_free"""
+        return await self._run(self.book_event_if_free, title, start_time, end_time, description, attendees, location)
+    
+    async def aget_available_slots(self, date: datetime, duration_minutes: int = 60) -> List[str]:
+        """Async variant of get_available_slots"""
+        return await self._run(self.get_available_slots, date, duration_minutes)
+    
+    async def aget_available_slots_multi(self, dates: List[datetime], duration_minutes: int = 60) -> Dict[_date, List[str]]:
+        """Async variant of get_available_slots_multi"""
+        semaphore = asyncio.Semaphore(_FANOUT_LIMIT)
+        
+        async def fetch(date: datetime) -> List[str]:
+            async with semaphore:
+                return await self.aget_available_slots(date, duration_minutes)
+        
+        results = await asyncio.gather(*(fetch(date) for date in dates))
+        return {date.date(): slots for date, slots in zip(dates, results)}
+    
+    async def aget_busy_intervals(self, start_time: datetime, end_time: datetime) -> List[Tuple[datetime, datetime]]:
+        """Async variant of get_busy_intervals"""
+        return await self._run(self.get_busy_intervals, start_time, end_time)
+    
+    async def aget_appointments_for_date(self, date: datetime) -> List[AppointmentSummary]:
+        """Async variant of get_appointments_for_date"""
+        return await self._run(self.get_appointments_for_date, date)
+    
+    async def aget_upcoming_appointments(self, days_ahead: int = 7) -> List[AppointmentSummary]:
+        """Async variant of get_upcoming_appointments"""
+        return await self._run(self.get_upcoming_appointments, days_ahead)
+    
+    async def aget_appointments_for_date_columnar(self, date: datetime) -> Dict[str, List[Any]]:
+        """Async variant of get_appointments_for_date_columnar"""
+        return await self._run(self.get_appointments_for_date_columnar, date)
+    
+    async def aget_appointments_for_date_page(self, date: datetime, page_size: Optional[int] = None, 
+                                              page_token: Optional[str] = None) -> Tuple[List[AppointmentSummary], Optional[str]]:
+        """Async variant of get_appointments_for_date_page"""
+        return await self._run(self.get_appointments_for_date_page, date, page_size, page_token)
+    
+    async def aget_upcoming_appointments_page(self, days_ahead: int = 7, page_size: Optional[int] = None, 
+                                              page_token: Optional[str] = None) -> Tuple[List[AppointmentSummary], Optional[str]]:
+        """Async variant of get_upcoming_appointments_page"""
+        return await self._run(self.get_upcoming_appointments_page, days_ahead, page_size, page_token)
+    
+    async def acancel_event(self, event_id: str) -> bool:
+        """Async variant of cancel_event"""
+        return await self._run(self.cancel_event, event_id)
+    
+    async def aupdate_event(self, event_id: str, **kwargs) -> bool:
+        """Async variant of update_event"""
+        return await self._run(self.update_event, event_id, **kwargs)
+    
+    async def aexecute_batch(self, requests: List[Any]) -> List[Any]:
+        """Async variant of execute_batch"""
+        return await self._run(self.execute_batch, requests)
+    
+    def _parse_datetime(self, datetime_obj: Dict[str, Any], keep_tz: bool = False) -> Optional[datetime]:
+        """Parse datetime from Google Calendar API response
+        
+        Returns the naive wall-clock time by default. With keep_tz the result is
+        aware, with all-day dates placed in the event's or calendar's time zone.
+        """
         try:
             if 'dateTime' in datetime_obj:
-                dt_str = datetime_obj['dateTime']
-                # Remove timezone info for simplicity
-                if dt_str.endswith('Z'):
-                    dt_str = dt_str[:-1]
-                elif '+' in dt_str:
-                    dt_str = dt_str.split('+')[0]
-                elif dt_str.count('-') > 2:  # Has timezone offset
-                    dt_str = dt_str.rsplit('-', 1)[0]
-                
-                return datetime.fromisoformat(dt_str)
+                # fromisoformat only accepts a 'Z' suffix from Python 3.11
+                dt_str = datetime_obj['dateTime'].replace('Z', '+00:00')
+                parsed = datetime.fromisoformat(dt_str)
             elif 'date' in datetime_obj:
                 # All-day event
-                return datetime.fromisoformat(datetime_obj['date'])
+                parsed = datetime.fromisoformat(datetime_obj['date'])
             else:
                 return None
+            
+            if not keep_tz:
+                # Remove timezone info for simplicity, keeping the wall-clock time
+                return parsed.replace(tzinfo=None)
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=ZoneInfo(datetime_obj.get('timeZone') or settings.CALENDAR_TIMEZONE))
+            return parsed
                 
         except Exception as e:
             logger.error(f"Error parsing datetime: {e}")
-            return None
\ No newline at end of file
+            return None
+
+@functools.lru_cache(maxsize=1)
+def get_calendar_service() -> GoogleCalendarService:
+    """Return the process-wide calendar service, creating it on first use"""
+    return GoogleCalendarService()